@@ -6,6 +6,7 @@ Adapted from KufarSearcher for Mercari.jp marketplace
 import os
 import time
 import logging
+import threading
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -30,6 +31,15 @@ class Config:
     # Database
     DATABASE_URL = os.getenv("DATABASE_URL")
     SQLITE_DB_PATH = os.getenv("SQLITE_DB_PATH", "mercari_scanner.db")
+    DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "16"))
+    # psycopg2 closes any connection returned while DB_POOL_MIN are already idle, so a small
+    # minimum means connect/close churn (and lost per-connection PREPAREs) under gthread load -
+    # default to a fixed-size pool
+    DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", str(DB_POOL_MAX)))
+    # DATABASE_URL points at PgBouncer in transaction mode (no session-level PREPARE)
+    DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+    # Direct (non-pooled) PostgreSQL URL for session advisory locks - required with DB_PGBOUNCER
+    DATABASE_DIRECT_URL = os.getenv("DATABASE_DIRECT_URL")
 
     # Telegram Bot
     TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
@@ -38,6 +48,7 @@ class Config:
 
     # Search Settings (defaults, can be overridden in DB)
     SEARCH_INTERVAL = int(os.getenv("SEARCH_INTERVAL", "300"))  # 5 minutes
+    FORCE_SCAN_IN_WORKER = os.getenv("FORCE_SCAN_IN_WORKER", "false").lower() == "true"  # Web UI scans run in worker service
     MAX_ITEMS_PER_SEARCH = int(os.getenv("MAX_ITEMS_PER_SEARCH", "50"))
 
     # Rate Limiting
@@ -58,7 +69,16 @@ class Config:
     # Web UI
     PORT = int(os.getenv("PORT", "5000"))
     WEB_UI_HOST = os.getenv("WEB_UI_HOST", "0.0.0.0")
+    WEB_UI_DEBUG = os.getenv("WEB_UI_DEBUG", "false").lower() == "true"  # Dev server only (reloader + debugger)
     SECRET_KEY = os.getenv("SECRET_KEY", os.urandom(24).hex())
+    REDIS_URL = os.getenv("REDIS_URL")  # Optional shared cache backend (in-process cache if unset)
+    DASHBOARD_CACHE_TIMEOUT = int(os.getenv("DASHBOARD_CACHE_TIMEOUT", "5"))  # seconds
+    IMAGE_CACHE_MB = int(os.getenv("IMAGE_CACHE_MB", "256"))  # In-process cache for proxied images
+    X_ACCEL_IMAGE_DIR = os.getenv("X_ACCEL_IMAGE_DIR")  # Behind nginx: hand stored images off via X-Accel-Redirect
+    X_ACCEL_IMAGE_LOCATION = os.getenv("X_ACCEL_IMAGE_LOCATION", "/_internal_images/")
+    X_ACCEL_IMAGE_MB = int(os.getenv("X_ACCEL_IMAGE_MB", "1024"))  # Size budget for X_ACCEL_IMAGE_DIR
+    IMAGE_DISK_CACHE_DIR = os.getenv("IMAGE_DISK_CACHE_DIR")  # Stored + proxied images as files, served via sendfile
+    IMAGE_DISK_CACHE_MB = int(os.getenv("IMAGE_DISK_CACHE_MB", "512"))  # Size budget for IMAGE_DISK_CACHE_DIR (proxied + item images)
     
     # Web UI Authentication
     WEB_USERNAME = os.getenv("WEB_USERNAME", "admin")
@@ -72,6 +92,7 @@ class Config:
     _config_cache = {}
     _last_reload_time = 0
     _reload_interval = 60  # Check every 60 seconds (reduced from 10s to save CPU/DB)
+    _reload_lock = threading.Lock()
 
     # Currency Settings
     DEFAULT_CURRENCY = "JPY"
@@ -137,8 +158,16 @@ class Config:
         if current_time - cls._last_reload_time < cls._reload_interval:
             return False  # Too soon to check again
 
-        cls._last_reload_time = current_time
+        with cls._reload_lock:
+            # Another thread may have reloaded while we waited for the lock
+            if current_time - cls._last_reload_time < cls._reload_interval:
+                return False
+            cls._last_reload_time = current_time
+            return cls._reload_from_db()
 
+    @classmethod
+    def _reload_from_db(cls):
+        """Apply config_* values from database, returns True if anything changed"""
         try:
             # Import here to avoid circular dependency
             from db import get_db
@@ -358,6 +387,30 @@ class Config:
 # Global config instance
 config = Config()
 
+_refresher_pid = None
+
+
+def start_config_refresher(interval: float = 10):
+    """
+    Run config.reload_if_needed() on a daemon thread so request handlers never hit the DB for it
+
+    Safe to call more than once; restarts the thread in a forked child.
+    """
+    global _refresher_pid
+    if _refresher_pid == os.getpid():
+        return
+
+    def _loop():
+        while True:
+            try:
+                config.reload_if_needed()
+            except Exception as e:
+                logger.error(f"[CONFIG] Background reload failed: {e}")
+            time.sleep(interval)
+
+    _refresher_pid = os.getpid()
+    threading.Thread(target=_loop, name='ConfigRefresher', daemon=True).start()
+
 
 def get_config():
     """Get global config instance"""
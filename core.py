@@ -7,12 +7,16 @@ Implements VS5-style individual scan intervals for each search query
 
 import logging
 import time
+import traceback
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 import concurrent.futures
+from functools import lru_cache
+from urllib.parse import urlparse, parse_qs
 
 from pyMercariAPI import Mercari
 from db import get_db
+from image_handler import get_original_image_url, download_image_bytes
 from proxies import proxy_rotator
 from configuration_values import config
 from shared_state import get_shared_state
@@ -392,8 +396,6 @@ class MercariSearcher:
         Returns:
             List of new items data
         """
-        from image_handler import get_original_image_url, download_and_encode_image
-        
         new_items = []
         
         logger.info(f"[PROCESS] 📦 Processing {len(items)} items from API response...")
@@ -469,14 +471,14 @@ class MercariSearcher:
                 else:
                     logger.warning(f"[PROCESS] ⚠️ No image URL for item {mercari_id}")
 
-                # Download and encode HIGH-RESOLUTION image
-                image_data = None
+                # Download HIGH-RESOLUTION image (stored as raw bytes, no base64 round trip)
+                image_bytes, image_mime = None, None
                 logger.debug(f"[PROCESS] DEBUG: Checking image_url = {image_url[:100] if image_url else 'NONE'}, bool={bool(image_url)}")
                 if image_url:
                     logger.info(f"[PROCESS] 📥 Downloading HIGH-RES image...")
-                    image_data = download_and_encode_image(image_url, timeout=20, use_proxy=False)
-                    if image_data:
-                        logger.info(f"[PROCESS] ✅ HIGH-RES image saved ({len(image_data)/1024:.1f}KB base64)")
+                    image_bytes, image_mime = download_image_bytes(image_url, timeout=20, use_proxy=False)
+                    if image_bytes:
+                        logger.info(f"[PROCESS] ✅ HIGH-RES image saved ({len(image_bytes)/1024:.1f}KB)")
                     else:
                         logger.warning(f"[PROCESS] ⚠️ Failed to download image, will add item without image data")
 
@@ -486,7 +488,7 @@ class MercariSearcher:
                 logger.info(f"[PROCESS]    Price: ¥{full_item.price:,}")
                 logger.info(f"[PROCESS]    Size: {full_item.size or 'N/A'}")
                 logger.info(f"[PROCESS]    Brand: {full_item.brand or 'N/A'}")
-                logger.info(f"[PROCESS]    Image: {'✅ HIGH-RES' if image_data else '⚠️ URL only'}")
+                logger.info(f"[PROCESS]    Image: {'✅ HIGH-RES' if image_bytes else '⚠️ URL only'}")
 
                 # Build correct item URL based on ID format
                 if mercari_id.startswith('m'):
@@ -513,7 +515,8 @@ class MercariSearcher:
                     location=full_item.location,
                     description=full_item.description,
                     category=full_item.category,
-                    image_data=image_data
+                    image_bytes=image_bytes,
+                    image_mime=image_mime
                 )
 
                 # If item was added (new), add to list
@@ -543,7 +546,6 @@ class MercariSearcher:
                         }
                     
                     item_dict['db_id'] = db_item_id
-                    item_dict['image_data'] = image_data  # Include for notifications
                     new_items.append(item_dict)
                     self.total_items_found += 1
                     
@@ -559,7 +561,6 @@ class MercariSearcher:
                 item_id_str = item_id if 'item_id' in locals() else 'unknown'
                 logger.error(f"[PROCESS] ❌ Failed to process item {item_id_str}: {e}")
                 self.db.log_error(f"Failed to process item {item_id_str}: {str(e)}", 'item_processing')
-                import traceback
                 logger.error(traceback.format_exc())
                 continue
 
@@ -580,40 +581,7 @@ class MercariSearcher:
         Returns:
             Dictionary with parsed parameters
         """
-        from urllib.parse import urlparse, parse_qs
-
-        try:
-            parsed = urlparse(search_url)
-
-            if 'mercari.com' not in parsed.netloc:
-                return {
-                    'valid': False,
-                    'error': 'Not a Mercari URL'
-                }
-
-            # Parse query parameters
-            params = parse_qs(parsed.query)
-
-            result = {
-                'valid': True,
-                'keyword': params.get('keyword', [None])[0],
-                'category_id': params.get('category_id', [None])[0],
-                'brand': params.get('brand', [None])[0],
-                'min_price': params.get('price_min', [None])[0],
-                'max_price': params.get('price_max', [None])[0],
-                'condition': params.get('item_condition_id', [None])[0],
-                'size': params.get('size_id', [None])[0],
-                'color': params.get('color_id', [None])[0],
-                'sort_order': params.get('sort', ['created_desc'])[0]
-            }
-
-            return result
-
-        except Exception as e:
-            return {
-                'valid': False,
-                'error': str(e)
-            }
+        return validate_search_url(search_url)
 
     def get_searcher_status(self) -> Dict[str, Any]:
         """
@@ -632,18 +600,63 @@ class MercariSearcher:
         }
 
 
+@lru_cache(maxsize=512)
+def _parse_search_url(search_url: str) -> Dict[str, Any]:
+    """
+    Parse Mercari search URL (memoized - must stay pure: no I/O, no config/DB reads)
+
+    Args:
+        search_url: Mercari search URL
+
+    Returns:
+        Dictionary with parsed parameters
+    """
+    try:
+        parsed = urlparse(search_url)
+
+        if 'mercari.com' not in parsed.netloc:
+            return {
+                'valid': False,
+                'error': 'Not a Mercari URL'
+            }
+
+        # Parse query parameters
+        params = parse_qs(parsed.query)
+
+        return {
+            'valid': True,
+            'keyword': params.get('keyword', [None])[0],
+            'category_id': params.get('category_id', [None])[0],
+            'brand': params.get('brand', [None])[0],
+            'min_price': params.get('price_min', [None])[0],
+            'max_price': params.get('price_max', [None])[0],
+            'condition': params.get('item_condition_id', [None])[0],
+            'size': params.get('size_id', [None])[0],
+            'color': params.get('color_id', [None])[0],
+            'sort_order': params.get('sort', ['created_desc'])[0]
+        }
+
+    except Exception as e:
+        return {
+            'valid': False,
+            'error': str(e)
+        }
+
+
 def validate_search_url(search_url: str) -> Dict[str, Any]:
     """
-    Standalone function to validate search URL
+    Standalone function to validate search URL (no MercariSearcher needed)
 
     Args:
         search_url: Mercari search URL
 
     Returns:
-        Dictionary with validation result
+        Dictionary with validation result (a fresh copy - callers may modify it)
     """
-    searcher = MercariSearcher(use_proxy=False)
-    return searcher.validate_search_url(search_url)
+    if not isinstance(search_url, str):
+        # lru_cache needs a hashable key; non-strings are never valid URLs anyway
+        return {'valid': False, 'error': 'Search URL must be a string'}
+    return dict(_parse_search_url(search_url))
 
 
 if __name__ == "__main__":
@@ -6,15 +6,109 @@ Supports both PostgreSQL (Railway) and SQLite (local development)
 """
 
 import os
+import json
+import orjson
+import queue
+import atexit
 import sqlite3
+import threading
+import time
+import weakref
 import psycopg2
-from psycopg2.extras import RealDictCursor
+import psycopg2.errors
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-import pytz
+from functools import lru_cache
+from zoneinfo import ZoneInfo
 from configuration_values import config
+from image_handler import decode_data_uri
+
+try:
+    import fcntl  # POSIX only - SQLite process locks are skipped without it
+except ImportError:
+    fcntl = None
 
 # Moscow timezone (GMT+3 / UTC+3)
-MOSCOW_TZ = pytz.timezone('Europe/Moscow')
+MOSCOW_TZ = ZoneInfo('Europe/Moscow')
+
+# SQLite compiled statement cache size (per connection, keyed by exact SQL text)
+SQLITE_STATEMENT_CACHE_SIZE = 256
+
+# Applied to every SQLite connection: WAL lets readers run during writes and, with
+# synchronous=NORMAL, commits no longer fsync twice (config-save bursts, scan inserts)
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-20000",
+)
+
+
+def connect_sqlite(db_path):
+    """Open SQLite connection with Row factory, statement cache and performance PRAGMAs"""
+    conn = sqlite3.connect(db_path, check_same_thread=False,
+                           cached_statements=SQLITE_STATEMENT_CACHE_SIZE)
+    conn.row_factory = sqlite3.Row
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+@lru_cache(maxsize=SQLITE_STATEMENT_CACHE_SIZE)
+def to_sqlite_query(query):
+    """Convert PostgreSQL query text to SQLite dialect (cached per distinct query)"""
+    return (query
+            .replace('%s', '?')
+            .replace('SERIAL', 'INTEGER')
+            .replace('BOOLEAN', 'INTEGER')
+            .replace('TIMESTAMP', 'TEXT'))
+
+
+# Log writes are queued and flushed by a background thread in multi-row batches
+LOG_QUEUE_MAX = 10000
+LOG_BATCH_SIZE = 50
+LOG_FLUSH_INTERVAL = 0.2  # seconds
+
+
+# Item columns for listings and notifications - never the image blobs (image_bytes/image_data),
+# which only /api/image/<id> reads
+ITEM_COLUMNS = """
+    i.id, i.mercari_id, i.search_id, i.title, i.price, i.currency,
+    i.brand, i.condition, i.size, i.shipping_cost, i.stock_quantity,
+    i.item_url, i.image_url,
+    i.seller_name, i.seller_rating, i.location, i.description, i.category,
+    i.is_sent, i.sent_at, i.found_at
+"""
+
+
+# Performance indexes, built with CREATE INDEX CONCURRENTLY on PostgreSQL (pre-deploy step) so
+# the scheduler's inserts, log writes and Web UI reads are not blocked while they build
+PERFORMANCE_INDEXES = (
+    # ORDER BY found_at DESC
+    ("idx_items_found_at", "items (found_at DESC)"),
+    # WHERE mercari_id LIKE 'm%' / NOT LIKE 'm%'
+    ("idx_items_mercari_id_pattern", "items (mercari_id text_pattern_ops)"),
+    # WHERE category_id IS NOT NULL
+    ("idx_items_category_id", "items (category_id) WHERE category_id IS NOT NULL"),
+    # Logs are always read newest-first (logs page, /api/logs), optionally by level
+    ("idx_logs_timestamp", "logs (timestamp DESC)"),
+    ("idx_logs_level_timestamp", "logs (level, timestamp DESC)"),
+)
+INDEX_MAINTENANCE_WORK_MEM = '256MB'
+INDEX_LOCK_NAME = 'mrs_index_bootstrap'
+
+
+# key_value_store key the web UI sets to hand a manual scan to the worker (FORCE_SCAN_IN_WORKER)
+FORCE_SCAN_REQUEST_KEY = 'force_scan_requested_at'
+
+
+def to_positional_query(query):
+    """Convert %s placeholders to PostgreSQL $1, $2, ... for PREPARE"""
+    parts = query.split('%s')
+    return parts[0] + ''.join(f"${index}{part}" for index, part in enumerate(parts[1:], start=1))
 
 
 def get_moscow_time():
@@ -28,6 +122,18 @@ class DatabaseManager:
     def __init__(self):
         self.db_type = None
         self.conn = None
+        # PostgreSQL: pooled connections, one per concurrent caller (slots block instead of failing)
+        self.pool = None
+        self._pool_slots = None
+        # SQLite: one shared connection - serialise statements from request threads and background jobs
+        self._lock = threading.RLock()
+        # Prepared statement names per pooled PostgreSQL connection (dropped with the connection)
+        self._prepared = weakref.WeakKeyDictionary()
+        self._log_queue = queue.Queue(maxsize=LOG_QUEUE_MAX)
+        self._log_writer = None
+        self._log_writer_pid = None
+        # Process-lifetime locks: name -> dedicated PostgreSQL connection or open lock file
+        self._process_locks = {}
         self.init_database()
 
     def init_database(self):
@@ -43,19 +149,28 @@ class DatabaseManager:
                 self.db_type = 'postgresql'
                 # Add connection timeout (10s) and statement timeout (30s) to prevent hangs
                 # NOTE: 30s allows index creation and heavy startup queries to complete
-                self.conn = psycopg2.connect(
+                self.pool = ThreadedConnectionPool(
+                    config.DB_POOL_MIN,
+                    config.DB_POOL_MAX,
                     database_url,
                     cursor_factory=RealDictCursor,
                     connect_timeout=10,
+                    # TCP keepalives: idle pooled connections dropped by the proxy/NAT are
+                    # detected by the kernel instead of failing the next query
+                    keepalives=1,
+                    keepalives_idle=30,
+                    keepalives_interval=10,
+                    keepalives_count=3,
                     options='-c statement_timeout=30000'  # 30 seconds in milliseconds
                 )
-                print(f"[DB] Connected to PostgreSQL (timeouts: connect=10s, statement=30s)")
+                self._pool_slots = threading.BoundedSemaphore(config.DB_POOL_MAX)
+                print(f"[DB] Connected to PostgreSQL (pool: {config.DB_POOL_MIN}-{config.DB_POOL_MAX}, "
+                      f"timeouts: connect=10s, statement=30s)")
             else:
                 # SQLite (local)
                 self.db_type = 'sqlite'
                 db_path = config.SQLITE_DB_PATH
-                self.conn = sqlite3.connect(db_path, check_same_thread=False)
-                self.conn.row_factory = sqlite3.Row
+                self.conn = connect_sqlite(db_path)
                 print(f"[DB] Connected to SQLite: {db_path}")
 
             self.create_tables()
@@ -66,8 +181,8 @@ class DatabaseManager:
                 # Fallback to in-memory SQLite on Railway
                 print("[DB] Using in-memory SQLite as fallback")
                 self.db_type = 'sqlite'
-                self.conn = sqlite3.connect(':memory:', check_same_thread=False)
-                self.conn.row_factory = sqlite3.Row
+                self.pool = None
+                self.conn = connect_sqlite(':memory:')
                 self.create_tables()
             else:
                 raise
@@ -194,6 +309,13 @@ class DatabaseManager:
                 print("[DB] Adding 'image_data' column to items table")
                 self.execute_query("ALTER TABLE items ADD COLUMN image_data TEXT")
 
+        # Raw image bytes + MIME type (served without base64 decoding; image_data kept for old rows)
+        bytes_type = 'BYTEA' if self.db_type == 'postgresql' else 'BLOB'
+        for column, column_type in (('image_bytes', bytes_type), ('image_mime', 'TEXT')):
+            if not self.has_column('items', column):
+                print(f"[DB] Adding '{column}' column to items table")
+                self.execute_query(f"ALTER TABLE items ADD COLUMN {column} {column_type}")
+
         # === INDEXES FOR PERFORMANCE ===
         # found_at: Critical for dashboard stats (last 2 days/hours) and cleanup
         self.execute_query("CREATE INDEX IF NOT EXISTS idx_items_found_at ON items(found_at)")
@@ -248,6 +370,13 @@ class DatabaseManager:
             )
         """)
 
+        # Logs are always read newest-first (logs page, /api/logs), optionally by level.
+        # PostgreSQL builds these CONCURRENTLY in the pre-deploy step (PERFORMANCE_INDEXES) -
+        # a plain CREATE INDEX here would block log inserts on a large table during startup
+        if self.db_type == 'sqlite':
+            self.execute_query("CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON logs(timestamp DESC)")
+            self.execute_query("CREATE INDEX IF NOT EXISTS idx_logs_level_timestamp ON logs(level, timestamp DESC)")
+
         # Key-value store for configuration
         self.execute_query("""
             CREATE TABLE IF NOT EXISTS key_value_store (
@@ -257,7 +386,6 @@ class DatabaseManager:
             )
         """)
 
-        self.conn.commit()
         print("[DB] Tables created successfully")
 
         # Initialize USD conversion rate if not set
@@ -275,71 +403,137 @@ class DatabaseManager:
         except Exception as e:
             print(f"[DB] Warning: Could not initialize default config: {e}")
 
+    @contextmanager
+    def connection(self):
+        """Borrow a connection: from the pool (PostgreSQL) or the shared one under lock (SQLite)"""
+        if self.pool is None:
+            with self._lock:
+                self._ensure_connection()
+                try:
+                    yield self.conn
+                except Exception:
+                    try:
+                        self.conn.rollback()
+                    except:
+                        pass
+                    raise
+            return
+
+        with self._pool_slots:
+            conn = self.pool.getconn()
+            # Every statement commits on its own, so skip the extra COMMIT round trip after reads
+            conn.autocommit = True
+            try:
+                yield conn
+            finally:
+                # Broken connections are discarded; the next getconn() opens a fresh one
+                self.pool.putconn(conn, close=bool(conn.closed))
+
     def execute_query(self, query, params=None, fetch=False, retry_count=3):
         """Execute SQL query with proper parameter binding and auto-reconnect"""
         last_exception = None
-        
+
+        # Convert PostgreSQL placeholders to SQLite if needed
+        # Identical SQL text lets sqlite3 reuse its compiled statement
+        if self.db_type == 'sqlite' and params:
+            query = to_sqlite_query(query)
+
         for attempt in range(retry_count):
             try:
-                # Ensure connection is alive before executing query
-                self._ensure_connection()
-                
-                # Convert PostgreSQL placeholders to SQLite if needed
-                if self.db_type == 'sqlite' and params:
-                    query = query.replace('%s', '?')
-                    query = query.replace('SERIAL', 'INTEGER')
-                    query = query.replace('BOOLEAN', 'INTEGER')
-                    query = query.replace('TIMESTAMP', 'TEXT')
-
-                cursor = self.conn.cursor()
+                with self.connection() as conn:
+                    cursor = conn.cursor()
 
-                if params:
-                    cursor.execute(query, params)
-                else:
-                    cursor.execute(query)
-
-                if fetch:
-                    # Both PostgreSQL (with RealDictCursor) and SQLite (with Row factory) return dict-like objects
-                    results = cursor.fetchall()
-                    if self.db_type == 'sqlite':
-                        # Convert sqlite3.Row to dict
-                        return [dict(row) for row in results]
+                    if params:
+                        cursor.execute(query, params)
                     else:
-                        # PostgreSQL with RealDictCursor already returns dict-like objects
-                        return results
+                        cursor.execute(query)
+
+                    if fetch:
+                        # Both PostgreSQL (with RealDictCursor) and SQLite (with Row factory) return dict-like objects
+                        results = cursor.fetchall()
+                        if self.db_type == 'sqlite':
+                            # Convert sqlite3.Row to dict
+                            return [dict(row) for row in results]
+                        else:
+                            # PostgreSQL with RealDictCursor already returns dict-like objects
+                            return results
 
-                self.conn.commit()
-                return cursor
+                    conn.commit()
+                    return cursor
 
             except (psycopg2.OperationalError, psycopg2.InterfaceError, sqlite3.OperationalError) as e:
                 last_exception = e
                 print(f"[DB ERROR] Connection error on attempt {attempt + 1}/{retry_count}: {e}")
-                
+
                 if attempt < retry_count - 1:
-                    print(f"[DB] Attempting to reconnect...")
-                    try:
-                        self._reconnect()
-                    except Exception as reconnect_error:
-                        print(f"[DB ERROR] Reconnection failed: {reconnect_error}")
-                        if attempt == retry_count - 1:
-                            raise
+                    if self.pool is None:
+                        print(f"[DB] Attempting to reconnect...")
+                        try:
+                            with self._lock:
+                                self._reconnect()
+                        except Exception as reconnect_error:
+                            print(f"[DB ERROR] Reconnection failed: {reconnect_error}")
                 else:
                     print(f"[DB ERROR] All retry attempts exhausted")
                     raise
-                    
+
             except Exception as e:
                 print(f"[DB ERROR] Query failed: {e}")
                 print(f"[DB ERROR] Query: {query}")
-                try:
-                    self.conn.rollback()
-                except:
-                    pass
                 raise
-        
+
         # If we exhausted all retries
         if last_exception:
             raise last_exception
-    
+
+
+    def execute_prepared(self, name, query, params=(), retry_count=3):
+        """
+        Fetch rows for a hot, fixed-shape query through a server-side prepared statement
+
+        PostgreSQL: PREPARE runs once per pooled connection, later calls only send
+        EXECUTE with the parameters (no re-parse / re-plan). SQLite already reuses
+        compiled statements, so it goes through execute_query(), as does PgBouncer in
+        transaction mode (a PREPARE would land on a different backend).
+        """
+        if self.pool is None or config.DB_PGBOUNCER:
+            return self.execute_query(query, params, fetch=True)
+
+        for attempt in range(retry_count):
+            try:
+                with self.connection() as conn:
+                    prepared = self._prepared.setdefault(conn, set())
+                    cursor = conn.cursor()
+                    if name not in prepared:
+                        cursor.execute(f"PREPARE {name} AS {to_positional_query(query)}")
+                        prepared.add(name)
+                    if params:
+                        cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+                    else:
+                        cursor.execute(f"EXECUTE {name}")
+                    return cursor.fetchall()
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                # Broken connection was discarded by the pool - retry on a fresh one
+                print(f"[DB ERROR] Connection error on attempt {attempt + 1}/{retry_count}: {e}")
+                if attempt == retry_count - 1:
+                    raise
+
+    def execute_query_one(self, query, params=None):
+        """Fetch a single row as a plain tuple (no dict-row construction), or None"""
+        if self.db_type == 'sqlite' and params:
+            query = to_sqlite_query(query)
+
+        with self.connection() as conn:
+            if self.db_type == 'sqlite':
+                cursor = conn.cursor()
+                cursor.row_factory = None
+            else:
+                cursor = conn.cursor(cursor_factory=psycopg2.extensions.cursor)
+            cursor.execute(query, params)
+            row = cursor.fetchone()
+            cursor.close()
+            return tuple(row) if row is not None else None
+
     def _ensure_connection(self):
         """Ensure database connection is alive"""
         if self.conn is None:
@@ -368,17 +562,10 @@ class DatabaseManager:
                 except:
                     pass
             
-            # Reconnect based on database type
-            database_url = config.DATABASE_URL
-            
-            if self.db_type == 'postgresql':
-                self.conn = psycopg2.connect(database_url, cursor_factory=RealDictCursor)
-                print(f"[DB] ✅ Reconnected to PostgreSQL")
-            else:
-                db_path = config.SQLITE_DB_PATH
-                self.conn = sqlite3.connect(db_path, check_same_thread=False)
-                self.conn.row_factory = sqlite3.Row
-                print(f"[DB] ✅ Reconnected to SQLite: {db_path}")
+            # PostgreSQL connections are recycled by the pool; only SQLite keeps a shared one
+            db_path = config.SQLITE_DB_PATH
+            self.conn = connect_sqlite(db_path)
+            print(f"[DB] ✅ Reconnected to SQLite: {db_path}")
                 
         except Exception as e:
             print(f"[DB ERROR] ❌ Failed to reconnect: {e}")
@@ -442,6 +629,20 @@ class DatabaseManager:
         query = "SELECT * FROM searches ORDER BY created_at DESC"
         return self.execute_query(query, fetch=True)
 
+    def get_all_searches_with_counts(self):
+        """Get all searches with their current item count (one aggregated query, no N+1)"""
+        query = """
+            SELECT s.*, COALESCE(c.items_count, 0) as items_count
+            FROM searches s
+            LEFT JOIN (
+                SELECT search_id, COUNT(*) as items_count
+                FROM items
+                GROUP BY search_id
+            ) c ON c.search_id = s.id
+            ORDER BY s.created_at DESC
+        """
+        return self.execute_query(query, fetch=True)
+
     def get_active_searches(self):
         """Get active searches"""
         query = "SELECT * FROM searches WHERE is_active = %s ORDER BY created_at DESC"
@@ -479,7 +680,7 @@ class DatabaseManager:
 
                 # Make timezone aware
                 if last_scan.tzinfo is None:
-                    last_scan = MOSCOW_TZ.localize(last_scan)
+                    last_scan = last_scan.replace(tzinfo=MOSCOW_TZ)
 
                 interval = search.get('scan_interval', 300)
                 next_scan = last_scan + timedelta(seconds=interval)
@@ -570,6 +771,39 @@ class DatabaseManager:
 
     # ==================== ITEMS ====================
 
+    def clear_all_items(self):
+        """
+        Delete every item (and its price history)
+
+        PostgreSQL uses TRUNCATE: constant time and WAL instead of per-row deletes.
+        Ids are not restarted, so item ids (image caches, ETags) never get reused.
+
+        Returns:
+            Number of items removed
+        """
+        if self.db_type == 'postgresql':
+            with self.connection() as conn:
+                # One transaction with the table locked first, so an insert from the scheduler
+                # can't land between the COUNT and the TRUNCATE (deleted but not counted)
+                conn.autocommit = False
+                try:
+                    cursor = conn.cursor(cursor_factory=psycopg2.extensions.cursor)
+                    cursor.execute("LOCK TABLE items IN ACCESS EXCLUSIVE MODE")
+                    cursor.execute("SELECT COUNT(*) FROM items")
+                    count = cursor.fetchone()[0]
+                    cursor.execute("TRUNCATE TABLE items, price_history")
+                    cursor.close()
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                finally:
+                    if not conn.closed:
+                        conn.autocommit = True
+                return count
+
+        return self.execute_query("DELETE FROM items").rowcount
+
     def add_item(self, mercari_id, search_id, **kwargs):
         """Add new item if not exists"""
         # Check if item already exists
@@ -585,9 +819,9 @@ class DatabaseManager:
             query = """
                 INSERT INTO items
                 (mercari_id, search_id, title, price, currency, brand, condition,
-                 size, shipping_cost, stock_quantity, item_url, image_url, image_data,
+                 size, shipping_cost, stock_quantity, item_url, image_url, image_bytes, image_mime,
                  seller_name, seller_rating, location, description, category, found_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                 RETURNING id
             """
         else:
@@ -595,14 +829,19 @@ class DatabaseManager:
             query = """
                 INSERT INTO items
                 (mercari_id, search_id, title, price, currency, brand, condition,
-                 size, shipping_cost, stock_quantity, item_url, image_url, image_data,
+                 size, shipping_cost, stock_quantity, item_url, image_url, image_bytes, image_mime,
                  seller_name, seller_rating, location, description, category, found_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """
         
         # Extract category for logging
         category_value = kwargs.get('category')
 
+        # Store the downloaded image as raw bytes; a legacy image_data data URI is decoded once here
+        image_bytes, image_mime = kwargs.get('image_bytes'), kwargs.get('image_mime')
+        if image_bytes is None:
+            image_bytes, image_mime = decode_data_uri(kwargs.get('image_data'))
+
         # DEBUG: Log category for Shops items
         if mercari_id and not mercari_id.startswith('m'):
             print(f"[DB ADD_ITEM] SHOPS item {mercari_id}: category = '{category_value}'")
@@ -620,7 +859,8 @@ class DatabaseManager:
             kwargs.get('stock_quantity', 1),
             kwargs.get('item_url'),
             kwargs.get('image_url'),
-            kwargs.get('image_data'),  # Base64-encoded image
+            image_bytes,
+            image_mime,
             kwargs.get('seller_name'),
             kwargs.get('seller_rating'),
             kwargs.get('location'),
@@ -655,8 +895,8 @@ class DatabaseManager:
         # This prevents race condition where two cycles get the same items
 
         # First, get the items
-        query_select = """
-            SELECT i.*, s.keyword as search_keyword, s.thread_id as search_thread_id
+        query_select = f"""
+            SELECT {ITEM_COLUMNS}, s.keyword as search_keyword, s.thread_id as search_thread_id
             FROM items i
             LEFT JOIN searches s ON i.search_id = s.id
             WHERE i.is_sent = %s
@@ -686,26 +926,54 @@ class DatabaseManager:
         query = "UPDATE items SET is_sent = %s, sent_at = %s WHERE id = %s"
         self.execute_query(query, (True, get_moscow_time(), item_id))
 
-    def get_all_items(self, limit=100, offset=0):
-        """Get recent items - FAST: without heavy image_data column"""
-        query = """
-            SELECT 
-                i.id, i.mercari_id, i.search_id, i.title, i.price, i.currency,
-                i.brand, i.condition, i.size, i.shipping_cost, i.stock_quantity,
-                i.item_url, i.image_url, 
-                i.seller_name, i.seller_rating, i.location, i.description, i.category,
-                i.is_sent, i.sent_at, i.found_at,
-                s.keyword as search_keyword
+    def get_all_items(self, limit=100, offset=0, after_id=None):
+        """
+        Get recent items - FAST: explicit column list never reads heavy image_data
+
+        Args:
+            limit: Page size
+            offset: Rows to skip (ignored when after_id is given)
+            after_id: Keyset cursor - return items with id < after_id, newest first
+                      (uses the primary key index, no OFFSET scan)
+        """
+        if after_id is not None:
+            where_clause = "WHERE i.id < %s"
+            order_clause = "ORDER BY i.id DESC LIMIT %s"
+            params = (after_id, limit)
+        else:
+            where_clause = ""
+            order_clause = "ORDER BY i.found_at DESC LIMIT %s OFFSET %s"
+            params = (limit, offset)
+
+        query = f"""
+            SELECT {ITEM_COLUMNS}, s.keyword as search_keyword
             FROM items i
             LEFT JOIN searches s ON i.search_id = s.id
-            ORDER BY i.found_at DESC
-            LIMIT %s OFFSET %s
+            {where_clause}
+            {order_clause}
+        """
+        return self.execute_query(query, params, fetch=True)
+
+    def get_items_fingerprint(self):
+        """Cheap fingerprint of items table (max id, total, sent) for HTTP ETags"""
+        query = """
+            SELECT
+                MAX(id) as max_id,
+                COUNT(*) as total,
+                COUNT(CASE WHEN is_sent = %s THEN 1 END) as sent
+            FROM items
         """
-        return self.execute_query(query, (limit, offset), fetch=True)
+        result = self.execute_prepared('items_fingerprint', query, (True,))
+        return result[0] if result else {'max_id': None, 'total': 0, 'sent': 0}
+
+    def store_image_bytes(self, item_id, image_bytes, image_mime):
+        """Replace an item's base64 image_data with raw bytes (one-time migration per row)"""
+        query = "UPDATE items SET image_bytes = %s, image_mime = %s, image_data = NULL WHERE id = %s"
+        self.execute_query(query, (image_bytes, image_mime, item_id))
 
     def get_item_by_mercari_id(self, mercari_id):
         """Get item by Mercari ID"""
-        query = "SELECT * FROM items WHERE mercari_id = %s"
+        query = f"SELECT {ITEM_COLUMNS} FROM items i WHERE i.mercari_id = %s"
         result = self.execute_query(query, (mercari_id,), fetch=True)
         return result[0] if result else None
 
@@ -786,6 +1054,38 @@ class DatabaseManager:
         """
         return self.execute_query(query, (limit,), fetch=True)
 
+    def get_error_summary(self, limit=50):
+        """
+        Categorise the most recent errors by HTTP status in one aggregate query
+
+        Categories are exclusive and checked in order: 403, 401, 429, other.
+        """
+        query = """
+            SELECT
+                COUNT(*) as total_errors,
+                COUNT(CASE WHEN category = '403' THEN 1 END) as errors_403,
+                COUNT(CASE WHEN category = '401' THEN 1 END) as errors_401,
+                COUNT(CASE WHEN category = '429' THEN 1 END) as errors_429,
+                COUNT(CASE WHEN category = 'other' THEN 1 END) as errors_other,
+                MAX(occurred_at) as newest_error,
+                MIN(occurred_at) as oldest_error
+            FROM (
+                SELECT
+                    CASE
+                        WHEN error_message LIKE %s THEN '403'
+                        WHEN error_message LIKE %s THEN '401'
+                        WHEN error_message LIKE %s THEN '429'
+                        ELSE 'other'
+                    END as category,
+                    occurred_at
+                FROM error_tracking
+                ORDER BY occurred_at DESC
+                LIMIT %s
+            ) recent_errors
+        """
+        result = self.execute_query(query, ('%403%', '%401%', '%429%', limit), fetch=True)
+        return dict(result[0]) if result else {'total_errors': 0}
+
     def get_unresolved_error_count(self):
         """Get count of unresolved errors"""
         query = "SELECT COUNT(*) as count FROM error_tracking WHERE is_resolved = %s"
@@ -814,8 +1114,67 @@ class DatabaseManager:
         if details:
             full_message = f"{full_message} - {details}"
 
-        query = "INSERT INTO logs (level, message, timestamp) VALUES (%s, %s, %s)"
-        self.execute_query(query, (level, full_message, get_moscow_time()))
+        row = (level, full_message, get_moscow_time())
+        self._ensure_log_writer()
+        try:
+            self._log_queue.put_nowait(row)
+        except queue.Full:
+            # Writer is falling behind - write synchronously rather than lose the entry
+            query = "INSERT INTO logs (level, message, timestamp) VALUES (%s, %s, %s)"
+            self.execute_query(query, row)
+
+    def _ensure_log_writer(self):
+        """Start the background log writer (again after a fork - threads don't survive it)"""
+        if self._log_writer_pid == os.getpid() and self._log_writer.is_alive():
+            return
+        with self._lock:
+            if self._log_writer_pid == os.getpid() and self._log_writer.is_alive():
+                return
+            self._log_writer = threading.Thread(target=self._log_writer_loop,
+                                                name='db-log-writer', daemon=True)
+            self._log_writer_pid = os.getpid()
+            self._log_writer.start()
+
+    def _log_writer_loop(self):
+        """Drain the log queue, writing up to LOG_BATCH_SIZE rows per LOG_FLUSH_INTERVAL"""
+        while True:
+            rows = [self._log_queue.get()]
+            deadline = time.monotonic() + LOG_FLUSH_INTERVAL
+            while len(rows) < LOG_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    rows.append(self._log_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write_log_rows(rows)
+
+    def flush_logs(self):
+        """Write any queued log entries immediately"""
+        rows = []
+        while True:
+            try:
+                rows.append(self._log_queue.get_nowait())
+            except queue.Empty:
+                break
+        for start in range(0, len(rows), LOG_BATCH_SIZE):
+            self._write_log_rows(rows[start:start + LOG_BATCH_SIZE])
+
+    def _write_log_rows(self, rows):
+        """Insert a batch of log rows in a single statement"""
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                if self.db_type == 'sqlite':
+                    cursor.executemany(
+                        "INSERT INTO logs (level, message, timestamp) VALUES (?, ?, ?)", rows)
+                else:
+                    execute_values(cursor,
+                                   "INSERT INTO logs (level, message, timestamp) VALUES %s", rows)
+                conn.commit()
+        except Exception as e:
+            print(f"[DB ERROR] Failed to write {len(rows)} log entries: {e}")
 
     def get_logs(self, limit=100, level=None):
         """Get recent logs - FAST with smaller default limit"""
@@ -859,43 +1218,179 @@ class DatabaseManager:
 
     # ==================== STATISTICS ====================
 
+    # Scalar subqueries keep every dashboard counter in one round-trip (PostgreSQL and SQLite)
+    STATISTICS_COLUMNS = """
+                (SELECT COUNT(*) FROM searches) as total_searches,
+                (SELECT COUNT(*) FROM searches WHERE is_active = %s) as active_searches,
+                (SELECT COUNT(*) FROM items) as total_items,
+                (SELECT COUNT(*) FROM items WHERE is_sent = %s) as unsent_items,
+                (SELECT COUNT(*) FROM error_tracking WHERE is_resolved = %s) as unresolved_errors
+    """
+    STATISTICS_PARAMS = (True, False, False)
+
     def get_statistics(self):
         """Get database statistics"""
-        stats = {}
-
-        # Total searches
-        result = self.execute_query("SELECT COUNT(*) as count FROM searches", fetch=True)
-        stats['total_searches'] = result[0]['count'] if result else 0
-
-        # Active searches
-        result = self.execute_query("SELECT COUNT(*) as count FROM searches WHERE is_active = %s", (True,), fetch=True)
-        stats['active_searches'] = result[0]['count'] if result else 0
-
-        # Total items
-        result = self.execute_query("SELECT COUNT(*) as count FROM items", fetch=True)
-        stats['total_items'] = result[0]['count'] if result else 0
-
-        # Unsent items
-        result = self.execute_query("SELECT COUNT(*) as count FROM items WHERE is_sent = %s", (False,), fetch=True)
-        stats['unsent_items'] = result[0]['count'] if result else 0
-
-        # Total errors
-        result = self.execute_query("SELECT COUNT(*) as count FROM error_tracking WHERE is_resolved = %s", (False,), fetch=True)
-        stats['unresolved_errors'] = result[0]['count'] if result else 0
+        query = f"SELECT {self.STATISTICS_COLUMNS}"
+        result = self.execute_query(query, self.STATISTICS_PARAMS, fetch=True)
+        if not result:
+            return {'total_searches': 0, 'active_searches': 0, 'total_items': 0,
+                    'unsent_items': 0, 'unresolved_errors': 0}
+        return {key: value or 0 for key, value in dict(result[0]).items()}
+
+    def get_dashboard_bundle(self):
+        """Get database statistics plus API request counter in a single query"""
+        query = f"""
+            SELECT {self.STATISTICS_COLUMNS},
+                (SELECT value FROM key_value_store WHERE key = %s) as api_request_count
+        """
+        result = self.execute_prepared('dashboard_bundle', query, self.STATISTICS_PARAMS + ('api_request_count',))
+        bundle = dict(result[0]) if result else {}
 
+        stats = {key: bundle.get(key) or 0 for key in
+                 ('total_searches', 'active_searches', 'total_items', 'unsent_items', 'unresolved_errors')}
+        stats['api_request_count'] = self._parse_counter(bundle.get('api_request_count'))
         return stats
 
     def close(self):
         """Close database connection"""
+        if self.pool:
+            self.pool.closeall()
+            print("[DB] Connection pool closed")
         if self.conn:
             self.conn.close()
             print("[DB] Connection closed")
 
+    def try_process_lock(self, name):
+        """
+        Take a named lock held until this process exits (e.g. one scheduler per deployment)
+
+        PostgreSQL: session advisory lock on a dedicated connection, so it also works across
+        Railway replicas and overlapping deploys. Session locks need a real server session, so
+        behind PgBouncer (DB_PGBOUNCER) DATABASE_DIRECT_URL must point past the pooler.
+        SQLite: flock on a file next to the database.
+
+        Returns:
+            True if this process holds the lock, False if another process does
+
+        Raises:
+            RuntimeError: DB_PGBOUNCER is set without DATABASE_DIRECT_URL
+        """
+        if name in self._process_locks:
+            return True
+
+        if self.db_type == 'postgresql':
+            lock_url = config.DATABASE_DIRECT_URL
+            if not lock_url:
+                if config.DB_PGBOUNCER:
+                    raise RuntimeError("DB_PGBOUNCER is set: process locks need DATABASE_DIRECT_URL "
+                                       "(a session advisory lock is not held through transaction pooling)")
+                lock_url = config.DATABASE_URL
+            conn = psycopg2.connect(lock_url, connect_timeout=10,
+                                    keepalives=1, keepalives_idle=30,
+                                    keepalives_interval=10, keepalives_count=3)
+            conn.autocommit = True
+            cursor = conn.cursor()
+            cursor.execute("SELECT pg_try_advisory_lock(hashtext(%s))", (name,))
+            acquired = cursor.fetchone()[0]
+            if not acquired:
+                conn.close()
+                return False
+            self._process_locks[name] = conn
+            return True
+
+        if fcntl is None or self.conn is None:
+            return True
+        lock_file = open(f"{config.SQLITE_DB_PATH}.{name}.lock", 'w')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._process_locks[name] = lock_file
+        return True
+
+    def process_lock_alive(self, name):
+        """
+        Check that a lock from try_process_lock is still held
+
+        PostgreSQL releases a session advisory lock silently when its connection drops, so the
+        lock connection is probed; a dead one is discarded and False returned.
+        """
+        if self.db_type != 'postgresql':
+            # flock is held by the open file for the life of the process
+            return True
+        lock = self._process_locks.get(name)
+        if lock is None:
+            return False
+        try:
+            with lock.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return True
+        except Exception as e:
+            print(f"[DB] Process lock '{name}' connection lost: {e}")
+            self._process_locks.pop(name, None)
+            try:
+                lock.close()
+            except Exception:
+                pass
+            return False
+
+    def create_indexes_concurrently(self, indexes=PERFORMANCE_INDEXES):
+        """
+        Build (name, definition) indexes with CREATE INDEX CONCURRENTLY (PostgreSQL only)
+
+        CONCURRENTLY cannot run inside a transaction block, so this uses its own autocommit
+        connection. An INVALID index left by an interrupted build is dropped and rebuilt,
+        since IF NOT EXISTS would otherwise skip it forever.
+        Guarded by an advisory lock, so when several deploys/services run this at once only
+        one builds and the rest skip.
+
+        Returns:
+            List of index names that failed
+        """
+        if self.db_type != 'postgresql':
+            return []
+
+        failed = []
+        conn = psycopg2.connect(config.DATABASE_URL, connect_timeout=10)
+        try:
+            conn.autocommit = True
+            cursor = conn.cursor()
+            cursor.execute("SELECT pg_try_advisory_lock(hashtext(%s))", (INDEX_LOCK_NAME,))
+            if not cursor.fetchone()[0]:
+                print("[DB] Another process is creating indexes, skipping")
+                return []
+            cursor.execute("SET maintenance_work_mem = %s", (INDEX_MAINTENANCE_WORK_MEM,))
+            cursor.execute("SET max_parallel_maintenance_workers = 4")
+
+            for name, definition in indexes:
+                try:
+                    cursor.execute("""
+                        SELECT ix.indisvalid FROM pg_index ix
+                        JOIN pg_class c ON c.oid = ix.indexrelid
+                        WHERE c.relname = %s
+                    """, (name,))
+                    row = cursor.fetchone()
+                    if row and not row[0]:
+                        print(f"[DB] Dropping invalid index {name} before rebuilding")
+                        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+                    cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+                except psycopg2.errors.DuplicateTable:
+                    # Another process built it at the same time
+                    pass
+                except Exception as e:
+                    print(f"[DB] Failed to create index {name}: {e}")
+                    failed.append(name)
+            cursor.execute("SELECT pg_advisory_unlock(hashtext(%s))", (INDEX_LOCK_NAME,))
+        finally:
+            # Closing the session also releases the lock if the build was interrupted
+            conn.close()
+        return failed
+
     # ==================== CONFIG MANAGEMENT ====================
 
     def save_config(self, key, value):
         """Save configuration value to database"""
-        import json
         try:
             value_str = json.dumps(value) if not isinstance(value, str) else value
             if self.db_type == 'sqlite':
@@ -919,16 +1414,52 @@ class DatabaseManager:
             print(f"[DB ERROR] Failed to save config {key}: {e}")
             return False
 
+    def save_config_many(self, values):
+        """
+        Save several configuration values in a single statement and transaction
+
+        Args:
+            values: Mapping of key -> value
+
+        Returns:
+            Number of values saved (0 if the batch failed)
+        """
+        if not values:
+            return 0
+
+        rows = [(key, json.dumps(value) if not isinstance(value, str) else value)
+                for key, value in values.items()]
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                if self.db_type == 'sqlite':
+                    cursor.executemany("""
+                        INSERT OR REPLACE INTO key_value_store (key, value, updated_at)
+                        VALUES (?, ?, datetime('now'))
+                    """, rows)
+                else:
+                    # One page = one statement, so the batch stays atomic under autocommit
+                    execute_values(cursor, """
+                        INSERT INTO key_value_store (key, value, updated_at)
+                        VALUES %s
+                        ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, updated_at = CURRENT_TIMESTAMP
+                    """, rows, template="(%s, %s, CURRENT_TIMESTAMP)", page_size=len(rows))
+                conn.commit()
+            print(f"[DB] Config saved: {', '.join(values)}")
+            return len(rows)
+        except Exception as e:
+            print(f"[DB ERROR] Failed to save config batch: {e}")
+            return 0
+
     def load_config(self, key, default=None):
         """Load configuration value from database"""
-        import json
         try:
             query = "SELECT value FROM key_value_store WHERE key = %s"
             result = self.execute_query(query, (key,), fetch=True)
             if result and len(result) > 0:
                 value_str = result[0]['value']
                 try:
-                    return json.loads(value_str)
+                    return orjson.loads(value_str)
                 except:
                     return value_str
             return default
@@ -936,16 +1467,25 @@ class DatabaseManager:
             print(f"[DB ERROR] Failed to load config {key}: {e}")
             return default
 
+    def load_config_version(self, key):
+        """Cheap change marker for a config value (its updated_at), None if missing"""
+        row = self.execute_query_one("SELECT updated_at FROM key_value_store WHERE key = %s", (key,))
+        return row[0] if row else None
+
+    def claim_config(self, key):
+        """Atomically remove a key; True only for the one caller that actually deleted it"""
+        query = "DELETE FROM key_value_store WHERE key = %s"
+        return self.execute_query(query, (key,)).rowcount > 0
+
     def get_all_config(self):
         """Get all configuration values"""
-        import json
         try:
             query = "SELECT key, value FROM key_value_store"
             results = self.execute_query(query, fetch=True)
             config_dict = {}
             for row in results:
                 try:
-                    config_dict[row['key']] = json.loads(row['value'])
+                    config_dict[row['key']] = orjson.loads(row['value'])
                 except:
                     config_dict[row['key']] = row['value']
             return config_dict
@@ -972,27 +1512,51 @@ class DatabaseManager:
     def get_api_counter(self):
         """Get current API request count from database"""
         try:
-            count = self.load_config('api_request_count', 0)
-            if isinstance(count, str):
-                return int(count) if count.isdigit() else 0
-            return int(count) if count else 0
+            return self._parse_counter(self.load_config('api_request_count', 0))
         except Exception as e:
             print(f"[DB ERROR] Failed to get API counter: {e}")
             return 0
 
+    @staticmethod
+    def _parse_counter(count):
+        """Convert stored counter value (int, numeric string or None) to int"""
+        if isinstance(count, str):
+            return int(count) if count.isdigit() else 0
+        return int(count) if count else 0
+
 
 # Global database instance
 _db_manager = None
+_db_manager_lock = threading.Lock()
 
 
 def get_db():
     """Get global database instance"""
     global _db_manager
     if _db_manager is None:
-        _db_manager = DatabaseManager()
+        # Lazy callers may race from several request threads - create exactly one manager
+        with _db_manager_lock:
+            if _db_manager is None:
+                _db_manager = DatabaseManager()
+                atexit.register(_db_manager.flush_logs)
     return _db_manager
 
 
+def close_db():
+    """
+    Flush and close the global database manager; the next get_db() opens a fresh one
+
+    Gunicorn calls this in the master before forking workers (preload_app), so pooled
+    connections opened during import are never shared between processes.
+    """
+    global _db_manager
+    with _db_manager_lock:
+        if _db_manager is not None:
+            _db_manager.flush_logs()
+            _db_manager.close()
+            _db_manager = None
+
+
 if __name__ == "__main__":
     # Test database
     db = get_db()
@@ -1,6 +1,6 @@
 """
 Gunicorn configuration for MercariSearcher
-Simple config - scheduler runs via wsgi.py
+Web UI only - the scheduler runs in the separate worker service (mercari_notifications.py)
 """
 
 import os
@@ -10,11 +10,21 @@ port = int(os.getenv('PORT', 8080))
 bind = f"0.0.0.0:{port}"
 
 # Worker configuration
-workers = 1  # Single worker to avoid multiple scheduler instances
+# In-process caches and background job tracking are per worker, so 1 worker is the default
+workers = int(os.getenv('WEB_CONCURRENCY', '1'))
+# Threaded worker: dashboard polls (/api/stats, /api/recent-items, /health) are IO-bound
+# and no longer queue behind each other or behind slow requests in the single process
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+# Import the app once in the master; workers fork from it (copy-on-write, faster boot/restart)
+preload_app = True
 timeout = 600  # 10 minutes - long timeout for background scheduler thread
 graceful_timeout = 30  # Graceful shutdown timeout
 loglevel = "info"
 
+
 # Worker lifecycle hooks
-# Note: Scheduler auto-starts via wsgi.py module-level code
-# No post_worker_init needed - wsgi.py handles everything
+def pre_fork(server, worker):
+    """Close DB connections the master opened while importing the app"""
+    from db import close_db
+    close_db()
@@ -9,7 +9,7 @@ import base64
 import requests
 import re
 import asyncio
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -122,26 +122,26 @@ def get_all_item_images(item_id: str) -> List[str]:
         return []
 
 
-def download_and_encode_image(
-    image_url: str, 
-    timeout: int = 15, 
+def download_image_bytes(
+    image_url: str,
+    timeout: int = 15,
     use_proxy: bool = False,
     max_size_kb: int = 500
-) -> Optional[str]:
+) -> Tuple[Optional[bytes], Optional[str]]:
     """
-    Download high-resolution image and encode to base64 for database storage
-    
+    Download high-resolution image as raw bytes for database storage (BYTEA/BLOB)
+
     Args:
         image_url: URL of the image to download
         timeout: Request timeout in seconds
         use_proxy: Whether to use proxy (False by default - works without proxy!)
         max_size_kb: Maximum image size in KB
-        
+
     Returns:
-        Base64-encoded data URI or None if failed
+        (image bytes, content type) or (None, None) if failed
     """
     if not image_url:
-        return None
+        return None, None
     
     try:
         # Convert to high-resolution URL first
@@ -180,13 +180,13 @@ def download_and_encode_image(
                 if proxy_rotator:
                     proxy_rotator.mark_current_failed()
             
-            return None
+            return None, None
         
         # Check content type
         content_type = response.headers.get('Content-Type', '')
         if not content_type.startswith('image/'):
             logger.warning(f"Invalid content type: {content_type}")
-            return None
+            return None, None
         
         # Read image bytes
         image_bytes = response.content
@@ -195,16 +195,10 @@ def download_and_encode_image(
         # Check size
         if image_size_kb > max_size_kb:
             logger.warning(f"Image too large: {image_size_kb:.1f}KB > {max_size_kb}KB, skipping")
-            return None
+            return None, None
         
-        # Encode to base64
-        base64_image = base64.b64encode(image_bytes).decode('utf-8')
-        
-        # Create data URI
-        data_uri = f"data:{content_type};base64,{base64_image}"
-        
-        logger.info(f"✅ Image encoded: {image_size_kb:.1f}KB → {len(data_uri)/1024:.1f}KB base64")
-        return data_uri
+        logger.info(f"✅ Image downloaded: {image_size_kb:.1f}KB")
+        return image_bytes, content_type.split(';')[0]
         
     except requests.Timeout:
         logger.warning(f"Timeout downloading image")
@@ -212,7 +206,7 @@ def download_and_encode_image(
             from proxies import proxy_rotator
             if proxy_rotator:
                 proxy_rotator.mark_current_failed()
-        return None
+        return None, None
         
     except requests.exceptions.ProxyError:
         logger.warning(f"Proxy error")
@@ -220,11 +214,49 @@ def download_and_encode_image(
             from proxies import proxy_rotator
             if proxy_rotator:
                 proxy_rotator.mark_current_failed()
-        return None
+        return None, None
         
     except Exception as e:
         logger.error(f"Error downloading image: {e}")
+        return None, None
+
+
+def download_and_encode_image(
+    image_url: str, 
+    timeout: int = 15, 
+    use_proxy: bool = False,
+    max_size_kb: int = 500
+) -> Optional[str]:
+    """
+    Download high-resolution image and encode to base64 data URI
+
+    Returns:
+        Base64-encoded data URI or None if failed
+    """
+    image_bytes, content_type = download_image_bytes(image_url, timeout, use_proxy, max_size_kb)
+    if not image_bytes:
         return None
+    return f"data:{content_type};base64,{base64.b64encode(image_bytes).decode('utf-8')}"
+
+
+def decode_data_uri(data_uri: Optional[str]) -> Tuple[Optional[bytes], Optional[str]]:
+    """
+    Split a base64 data URI into raw bytes and MIME type
+
+    Args:
+        data_uri: String like data:image/jpeg;base64,{data}
+
+    Returns:
+        (image bytes, content type) or (None, None) if not a data URI
+    """
+    if not data_uri or not data_uri.startswith('data:'):
+        return None, None
+
+    header, separator, payload = data_uri.partition(',')
+    if not separator:
+        return None, None
+
+    return base64.b64decode(payload), header[len('data:'):].split(';')[0]
 
 
 def download_image_to_file(image_url: str, output_path: Path, timeout: int = 15) -> bool:
@@ -6,14 +6,19 @@ Adapted from KufarSearcher (KS1)
 
 import os
 import sys
+import random
+import signal
+import asyncio
 import logging
+import threading
+import traceback
 import schedule
 import time
-from datetime import datetime
-import pytz
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
 
 from configuration_values import config
-from db import get_db
+from db import get_db, FORCE_SCAN_REQUEST_KEY
 from core import MercariSearcher
 from simple_telegram_worker import process_pending_notifications, send_system_message
 from shared_state import get_shared_state
@@ -21,16 +26,52 @@ from railway_redeploy import redeployer
 from metrics_storage import metrics_storage
 from proxies import proxy_manager
 
+# Optional uvloop (not available on Windows): faster event loop for asyncio.run() in
+# the scraper's async image lookups
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
+# Read once at import - the environment doesn't change for the life of the process
+IS_RAILWAY = bool(os.environ.get('RAILWAY_ENVIRONMENT'))
+
 # Timezones
-MOSCOW_TZ = pytz.timezone('Europe/Moscow')
-UTC_TZ = pytz.UTC
+MOSCOW_TZ = ZoneInfo('Europe/Moscow')
+UTC_TZ = timezone.utc
+
+# Max seconds startup work (first scan, startup message) waits for the scheduler loop
+SCHEDULER_READY_TIMEOUT = 30
+
+# Only one scheduler may run per database; a second worker waits as a standby
+SCHEDULER_LOCK_NAME = 'mrs_scheduler'
+SCHEDULER_LOCK_RETRY = 30  # seconds between standby attempts
+SCHEDULER_LOCK_CHECK_INTERVAL = 10  # seconds between checks that the held lock is still alive
+
+# Cycle retries: truncated exponential backoff with jitter, so retries during an outage
+# back off and don't line up with other processes retrying against Mercari
+RETRY_BACKOFF_BASE = 5  # seconds
+RETRY_BACKOFF_MAX = 60
+
+
+def retry_delay(attempt):
+    """Seconds to wait before retry number `attempt` (1-based): half fixed, half random"""
+    base = min(RETRY_BACKOFF_BASE * 2 ** min(attempt - 1, 6), RETRY_BACKOFF_MAX)
+    return base / 2 + random.uniform(0, base / 2)
+
+
+# Line-buffered stdout/stderr: each log line reaches Railway promptly without the
+# per-write flush of PYTHONUNBUFFERED=1
+sys.stdout.reconfigure(line_buffering=True, write_through=False)
+sys.stderr.reconfigure(line_buffering=True)
 
 # Setup logging
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 LOG_LEVEL = getattr(logging, config.LOG_LEVEL.upper(), logging.INFO)
 
 # Configure logging based on environment
-if os.getenv('RAILWAY_ENVIRONMENT'):
+if IS_RAILWAY:
     # Railway: log to stdout
     logging.basicConfig(
         level=LOG_LEVEL,
@@ -58,6 +99,10 @@ class MercariNotificationApp:
         self.db = get_db()
         self.shared_state = get_shared_state()
         self.searcher = None
+        # Set on the scheduler loop's first iteration - startup work waits on it instead of sleeping
+        self.loop_started = threading.Event()
+        # Set by SIGTERM (Railway stop/redeploy) - every wait in the worker wakes on it immediately
+        self.stop_requested = threading.Event()
 
         logger.info("=" * 60)
         logger.info(f"{config.APP_NAME} v{config.APP_VERSION} Starting...")
@@ -118,8 +163,7 @@ class MercariNotificationApp:
 
         while retry_count < max_retries:
             try:
-                from datetime import datetime as dt_now
-                current_time_str = dt_now.now(MOSCOW_TZ).strftime('%Y-%m-%d %H:%M:%S %Z')
+                current_time_str = datetime.now(MOSCOW_TZ).strftime('%Y-%m-%d %H:%M:%S %Z')
                 logger.info("\n" + "=" * 60)
                 logger.info(f"Starting search cycle at {current_time_str}")
                 logger.info("=" * 60)
@@ -151,13 +195,12 @@ class MercariNotificationApp:
                     logger.error(f"Failed to log error to database: {db_error}")
                 
                 if retry_count < max_retries:
-                    sleep_time = retry_count * 5  # Exponential backoff
-                    logger.info(f"[SEARCH] Retrying in {sleep_time} seconds...")
-                    time.sleep(sleep_time)
+                    sleep_time = retry_delay(retry_count)
+                    logger.info(f"[SEARCH] Retrying in {sleep_time:.1f} seconds...")
+                    if self.stop_requested.wait(sleep_time):
+                        return
                 else:
-                    logger.error(f"[SEARCH] All retry attempts exhausted")
-                    import traceback
-                    logger.error(f"[SEARCH] Traceback:\n{traceback.format_exc()}")
+                    logger.exception("[SEARCH] All retry attempts exhausted")
                     # Don't raise - let scheduler continue
     
     def telegram_cycle(self):
@@ -190,9 +233,7 @@ class MercariNotificationApp:
             except Exception as e:
                 retry_count += 1
                 logger.error(f"[TELEGRAM] Notification cycle error (attempt {retry_count}/{max_retries}): {e}")
-                logger.error(f"[TELEGRAM] Error details: {type(e).__name__}: {str(e)}")
-                import traceback
-                logger.error(f"[TELEGRAM] Traceback:\n{traceback.format_exc()}")
+                logger.exception(f"[TELEGRAM] Error details: {type(e).__name__}: {str(e)}")
                 
                 self.shared_state.add_error(str(e))
                 
@@ -202,9 +243,10 @@ class MercariNotificationApp:
                     logger.error(f"Failed to log error to database: {db_error}")
                 
                 if retry_count < max_retries:
-                    sleep_time = retry_count * 5  # Exponential backoff
-                    logger.info(f"[TELEGRAM] Retrying in {sleep_time} seconds...")
-                    time.sleep(sleep_time)
+                    sleep_time = retry_delay(retry_count)
+                    logger.info(f"[TELEGRAM] Retrying in {sleep_time:.1f} seconds...")
+                    if self.stop_requested.wait(sleep_time):
+                        return
                 else:
                     logger.error(f"[TELEGRAM] All retry attempts exhausted")
                     # Don't raise - let scheduler continue
@@ -229,8 +271,32 @@ class MercariNotificationApp:
             except Exception as e:
                 logger.error(f"Proxy refresh error: {e}")
 
+    def wait_for_scheduler_lock(self):
+        """
+        Block until this process owns the scheduler lock (another worker may still be running)
+
+        Returns:
+            False if shutdown was requested while standing by
+        """
+        while True:
+            try:
+                if self.db.try_process_lock(SCHEDULER_LOCK_NAME):
+                    logger.info("[SCHEDULER] 🔒 Scheduler lock acquired")
+                    return True
+                logger.warning(f"[SCHEDULER] Another worker owns the scheduler - "
+                               f"standing by (retry in {SCHEDULER_LOCK_RETRY}s)")
+            except Exception as e:
+                # Fail closed: an overlapping deploy may hold the lock, and two schedulers
+                # would send duplicate notifications
+                logger.error(f"[SCHEDULER] Scheduler lock check failed (retry in {SCHEDULER_LOCK_RETRY}s): {e}")
+            if self.stop_requested.wait(SCHEDULER_LOCK_RETRY):
+                return False
+
     def run_scheduler(self):
         """Run the scheduler"""
+        if not self.wait_for_scheduler_lock():
+            return
+
         logger.info("\n" + "=" * 60)
         logger.info("Starting scheduler")
         logger.info(f"Search cycle will run every {config.SEARCH_INTERVAL} seconds (Query Delay)")
@@ -249,8 +315,7 @@ class MercariNotificationApp:
         # This runs in a separate thread to not block the scheduler
         def send_startup_notification():
             try:
-                import time
-                time.sleep(2)  # Small delay to ensure loop started
+                self.loop_started.wait(timeout=SCHEDULER_READY_TIMEOUT)
 
                 active_searches = self.db.get_active_searches()
                 logger.info(f"[STARTUP] ✅ Active searches: {len(active_searches)}")
@@ -260,17 +325,15 @@ class MercariNotificationApp:
                 send_system_message(
                     f"🚀 MercariSearcher started\n"
                     f"Version: {config.APP_VERSION}\n"
-                    f"Environment: {'Railway' if os.getenv('RAILWAY_ENVIRONMENT') else 'Local'}\n"
+                    f"Environment: {'Railway' if IS_RAILWAY else 'Local'}\n"
                     f"Active searches: {len(active_searches)}"
                 )
                 logger.info(f"[STARTUP] ✅ Startup notification sent to Telegram")
             except Exception as e:
                 logger.warning(f"[STARTUP] ⚠️  Failed to send startup notification: {e}")
-                import traceback
                 logger.warning(f"[STARTUP] Traceback:\n{traceback.format_exc()}")
 
         # Start notification in background thread (non-blocking)
-        import threading
         notification_thread = threading.Thread(target=send_startup_notification, daemon=True)
         notification_thread.start()
 
@@ -283,13 +346,23 @@ class MercariNotificationApp:
         self.db.add_log_entry('INFO', f'[SCHEDULER] Entering main loop with {len(schedule.get_jobs())} jobs', 'scheduler')
 
         # Get health state from shared_state for heartbeat updates
-        from datetime import datetime as dt_for_heartbeat
-        self.shared_state.set('scheduler_last_heartbeat', dt_for_heartbeat.now())
+        self.shared_state.set('scheduler_last_heartbeat', datetime.now())
         self.shared_state.set('scheduler_is_alive', True)
 
         loop_iteration = 0
         last_heartbeat_log = 0
-        while True:
+        last_lock_check = time.time()
+        while not self.stop_requested.is_set():
+            # The lock's DB session can drop (and with it the lock) while we keep running -
+            # stop scheduling and stand by until we hold it again
+            if time.time() - last_lock_check >= SCHEDULER_LOCK_CHECK_INTERVAL:
+                last_lock_check = time.time()
+                if not self.db.process_lock_alive(SCHEDULER_LOCK_NAME):
+                    logger.error("[SCHEDULER] ❌ Scheduler lock lost - pausing until it is re-acquired")
+                    if not self.wait_for_scheduler_lock():
+                        break
+                    last_lock_check = time.time()
+
             # Update heartbeat in shared state (for web UI)
             # This is non-blocking and fast (Redis/memory)
             self.shared_state.update_heartbeat()
@@ -305,8 +378,9 @@ class MercariNotificationApp:
 
                 # Log first iteration and every 10 seconds
                 if loop_iteration == 1:
+                    self.loop_started.set()
                     # Debug: Check schedule state
-                    current_time = dt_for_heartbeat.now()
+                    current_time = datetime.now()
                     jobs_info = []
                     for job in schedule.get_jobs():
                         jobs_info.append(f"{job.job_func.__name__}: next={job.next_run}")
@@ -369,9 +443,7 @@ class MercariNotificationApp:
                 try:
                     schedule.run_pending()
                 except Exception as schedule_error:
-                    logger.error(f"[SCHEDULER] ❌ Error in run_pending(): {schedule_error}")
-                    import traceback
-                    logger.error(f"[SCHEDULER] Traceback:\n{traceback.format_exc()}")
+                    logger.exception(f"[SCHEDULER] ❌ Error in run_pending(): {schedule_error}")
                     # REMOVED: DB logging to prevent hangs when PostgreSQL connection is lost
                     # try:
                     #     self.db.add_log_entry('ERROR', f'[SCHEDULER] run_pending() error: {str(schedule_error)[:100]}', 'scheduler')
@@ -389,7 +461,7 @@ class MercariNotificationApp:
                 # DB WRITE REMOVED - was blocking scheduler when PostgreSQL hangs
                 if loop_iteration % 10 == 0:
                     try:
-                        current_heartbeat = dt_for_heartbeat.now()
+                        current_heartbeat = datetime.now()
                         self.shared_state.set('scheduler_last_heartbeat', current_heartbeat)
                         self.shared_state.set('scheduler_is_alive', True)
                         # NO DATABASE WRITE - prevents blocking when DB connection fails
@@ -398,19 +470,27 @@ class MercariNotificationApp:
                         logger.warning(f"[SCHEDULER] Failed to update heartbeat: {heartbeat_error}")
                         pass
 
-                time.sleep(1)
+                self.stop_requested.wait(1)
             except KeyboardInterrupt:
                 logger.info("\nShutdown requested by user")
                 break
             except Exception as e:
-                logger.error(f"[SCHEDULER] ❌ Scheduler error: {e}")
-                import traceback
-                logger.error(f"[SCHEDULER] Traceback:\n{traceback.format_exc()}")
-                time.sleep(5)
+                logger.exception(f"[SCHEDULER] ❌ Scheduler error: {e}")
+                self.stop_requested.wait(5)
 
         # Cleanup
         self.shutdown()
 
+    def check_force_scan_request(self):
+        """Run a search cycle if the web UI queued a manual scan (FORCE_SCAN_IN_WORKER)"""
+        try:
+            # Claim first: a click during the scan queues exactly one more run
+            if self.db.claim_config(FORCE_SCAN_REQUEST_KEY):
+                logger.info("[SCHEDULER] 🔍 Manual scan requested from web UI - running search cycle")
+                self.search_cycle()
+        except Exception as e:
+            logger.error(f"[SCHEDULER] ❌ Manual scan request failed: {e}")
+
     def _setup_schedule(self):
         """Setup or recreate the schedule with current config"""
         # Clear existing jobs
@@ -435,10 +515,14 @@ class MercariNotificationApp:
         proxy_job = schedule.every(2).hours.do(self.refresh_proxies)
         proxy_job.tag('proxies')
 
+        # 4. Manual scans queued by the web UI
+        if config.FORCE_SCAN_IN_WORKER:
+            force_scan_job = schedule.every(5).seconds.do(self.check_force_scan_request)
+            force_scan_job.tag('force_scan')
+
         # Run first search cycle immediately (in background thread to not block setup)
         def run_first_cycle():
-            import time
-            time.sleep(2)  # Small delay to ensure scheduler loop is running
+            self.loop_started.wait(timeout=SCHEDULER_READY_TIMEOUT)
             try:
                 logger.info(f"[SCHEDULER] 🚀 Running first search cycle immediately...")
                 self.search_cycle()
@@ -446,7 +530,6 @@ class MercariNotificationApp:
             except Exception as e:
                 logger.error(f"[SCHEDULER] ❌ First search cycle failed: {e}")
 
-        import threading
         first_cycle_thread = threading.Thread(target=run_first_cycle, daemon=True)
         first_cycle_thread.start()
 
@@ -478,7 +561,8 @@ class MercariNotificationApp:
         app.run(
             host=config.WEB_UI_HOST,
             port=config.PORT,
-            debug=False
+            debug=False,
+            threaded=True
         )
 
 
@@ -490,14 +574,20 @@ def main():
     app = MercariNotificationApp()
 
     if mode == 'web':
-        # Web UI only mode
+        # Web UI only mode - Werkzeug's server keeps the default SIGTERM behaviour
         app.run_web_ui()
-    elif mode == 'worker':
-        # Worker only mode
-        app.run_scheduler()
-    else:
-        # Default: run scheduler
-        app.run_scheduler()
+        return
+
+    def handle_sigterm(signum, frame):
+        logger.info("[SCHEDULER] SIGTERM received, stopping after the current job")
+        app.stop_requested.set()
+
+    # Scheduler modes only: the loop waits on stop_requested. Without a handler SIGTERM kills
+    # the process outright - no shutdown() and no atexit log flush
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+    # 'worker' and default mode both run the scheduler
+    app.run_scheduler()
 
 
 if __name__ == '__main__':
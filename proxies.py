@@ -5,6 +5,7 @@ Copied from KufarSearcher with Mercari URL adaptation
 
 import requests
 import logging
+import random
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Optional, Dict
@@ -188,7 +189,6 @@ class ProxyManager:
             return None
 
         if random_choice:
-            import random
             return random.choice(self.working_proxies)
         else:
             # Rotate: move first to end
@@ -2,10 +2,13 @@
 Main Mercari API wrapper class using mercapi library
 """
 
+import re
 import time
 import random
 import logging
 import asyncio
+import concurrent.futures
+from urllib.parse import urlparse, parse_qs, urlencode
 from typing import Optional, Dict, Any, List
 from .items import Item, Items
 from .exceptions import (
@@ -100,7 +103,6 @@ class Mercari:
         # Check if loop is already running (e.g., in Flask with async context)
         if loop.is_running():
             # Create a new loop in a thread
-            import concurrent.futures
             with concurrent.futures.ThreadPoolExecutor() as executor:
                 future = executor.submit(asyncio.run, coro)
                 return future.result()
@@ -409,7 +411,6 @@ class Mercari:
                     
                     # Convert thumbnail URL to full-size image
                     if base_image:
-                        import re
                         full_image = base_image
                         
                         # For shops products: convert /-/small/ to /-/large/
@@ -464,8 +465,6 @@ class Mercari:
             return search_url
 
         # Parse URL to extract keyword parameter
-        from urllib.parse import urlparse, parse_qs
-
         try:
             parsed = urlparse(search_url)
             params = parse_qs(parsed.query)
@@ -510,8 +509,6 @@ class Mercari:
             return search_params
 
         # Parse URL
-        from urllib.parse import urlparse, parse_qs
-
         try:
             parsed = urlparse(search_url)
             params = parse_qs(parsed.query)
@@ -638,7 +635,6 @@ class Mercari:
                 item_data['image_url'] = full_item.photos[0]
             elif hasattr(full_item, 'thumbnails') and full_item.thumbnails:
                 # Fallback to thumbnails and upgrade to high-res
-                import re
                 thumbnail = full_item.thumbnails[0]
                 # Upgrade thumbnail to high-res
                 high_res = re.sub(r'w_\d+', 'w_1200', thumbnail)
@@ -651,7 +647,6 @@ class Mercari:
                 logger.info(f"Using thumbnail for shops product {item_id}: {high_res[:80]}")
             elif hasattr(full_item, 'thumbnail') and full_item.thumbnail:
                 # Last fallback: single thumbnail
-                import re
                 thumbnail = full_item.thumbnail
                 high_res = re.sub(r'w_\d+', 'w_1200', thumbnail)
                 high_res = re.sub(r'h_\d+', 'h_1200', high_res)
@@ -709,7 +704,6 @@ class Mercari:
             Full search URL
         """
         from configuration_values import config
-        from urllib.parse import urlencode
 
         base_url = f"{config.MERCARI_BASE_URL}/search"
 
@@ -779,8 +773,6 @@ class Mercari:
         Returns:
             Size string or None
         """
-        import re
-
         # Get both title and description (search results have title but not description)
         title = getattr(item, 'name', '') or getattr(item, 'title', '') or ''
         description = getattr(item, 'description', '') or ''
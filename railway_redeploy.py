@@ -4,6 +4,8 @@ Copied from KufarSearcher
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
 from datetime import datetime, timedelta
 from configuration_values import config
@@ -11,6 +13,15 @@ from db import get_db
 
 logger = logging.getLogger(__name__)
 
+# Shared HTTP session for Railway API - reuses TLS connections to backboard.railway.app
+# Retries only cover connection failures (POST mutations are not re-sent after a response)
+railway_session = requests.Session()
+railway_session.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(total=2, backoff_factor=0.2)
+))
+
 
 class RailwayRedeployer:
     """Handles automatic redeployment on Railway"""
@@ -19,7 +30,6 @@ class RailwayRedeployer:
         self.railway_token = config.RAILWAY_TOKEN
         self.project_id = config.RAILWAY_PROJECT_ID
         self.service_id = config.RAILWAY_SERVICE_ID
-        self.db = get_db()
 
         self.api_url = "https://backboard.railway.app/graphql"
         self.headers = {
@@ -29,6 +39,11 @@ class RailwayRedeployer:
 
         self.max_errors = config.MAX_ERRORS_BEFORE_REDEPLOY
 
+    @property
+    def db(self):
+        """Current DB manager - resolved per use, so an instance built at import survives a fork"""
+        return get_db()
+
     def check_and_redeploy_if_needed(self) -> bool:
         """
         Check error count and redeploy if threshold exceeded
@@ -115,7 +130,7 @@ class RailwayRedeployer:
                 "variables": variables
             }
 
-            response = requests.post(
+            response = railway_session.post(
                 self.api_url,
                 json=payload,
                 headers=self.headers,
@@ -187,7 +202,7 @@ class RailwayRedeployer:
                 "variables": variables
             }
 
-            response = requests.post(
+            response = railway_session.post(
                 self.api_url,
                 json=payload,
                 headers=self.headers,
@@ -229,7 +244,7 @@ class RailwayRedeployer:
                 "variables": variables
             }
 
-            response = requests.post(
+            response = railway_session.post(
                 self.api_url,
                 json=payload,
                 headers=self.headers,
@@ -5,16 +5,25 @@ Adapted from KufarSearcher with USD price display
 """
 
 import logging
+import html
+import threading
+import traceback
 import requests
+from requests.adapters import HTTPAdapter
 from typing import List, Dict, Any, Optional
 import time
 
 from configuration_values import config
-from db import get_db
+from db import get_db, get_moscow_time
+from image_handler import get_original_image_url
 from shared_state import get_shared_state
 
 logger = logging.getLogger(__name__)
 
+# Shared HTTP session - keeps connections to api.telegram.org alive between sends
+telegram_session = requests.Session()
+telegram_session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
 
 class TelegramWorker:
     """Worker for sending Telegram notifications"""
@@ -72,7 +81,6 @@ class TelegramWorker:
             image_url = item.get('image_url')
             if image_url:
                 try:
-                    from image_handler import get_original_image_url
                     # Convert to highest quality available
                     image_url = get_original_image_url(image_url)
                     logger.debug(f"[TW] High-res image URL: {image_url[:80]}...")
@@ -102,7 +110,6 @@ class TelegramWorker:
                 if item_id:
                     try:
                         # Update sent_at timestamp (is_sent already True from get_unsent_items)
-                        from db import get_moscow_time
                         query = "UPDATE items SET sent_at = %s WHERE id = %s"
                         self.db.execute_query(query, (get_moscow_time(), item_id))
                         logger.info(f"[TW] ✅ Updated sent_at for item {item_id}")
@@ -137,9 +144,7 @@ class TelegramWorker:
             return success
 
         except Exception as e:
-            logger.error(f"[TW] ❌ Failed to send notification for item {item_id}: {e}")
-            import traceback
-            logger.error(f"[TW] Traceback:\n{traceback.format_exc()}")
+            logger.exception(f"[TW] ❌ Failed to send notification for item {item_id}: {e}")
             self.db.add_log_entry('ERROR', f'[TW.send] Exception {item_id}: {str(e)[:100]}', 'telegram')
             # Log error to database
             try:
@@ -159,7 +164,6 @@ class TelegramWorker:
             Formatted message string
         """
         # Title
-        import html
         title = html.escape(item.get('title', 'No title'))
 
         # Price in JPY and USD
@@ -249,7 +253,7 @@ class TelegramWorker:
                     payload["message_thread_id"] = thread_id or self.thread_id
 
                 logger.info(f"[TW] Sending photo to Telegram (attempt {attempt+1}/{self.max_retries})...")
-                response = requests.post(url, json=payload, timeout=30)
+                response = telegram_session.post(url, json=payload, timeout=30)
 
                 if response.status_code == 200:
                     logger.info("[TW] ✅ Photo sent successfully")
@@ -264,7 +268,7 @@ class TelegramWorker:
                         if "message_thread_id" in payload:
                             logger.info("[TW] Thread not found, retrying without thread_id...")
                             payload.pop("message_thread_id")
-                            response = requests.post(url, json=payload, timeout=30)
+                            response = telegram_session.post(url, json=payload, timeout=30)
                             if response.status_code == 200:
                                 logger.info("[TW] ✅ Photo sent successfully (without thread)")
                                 return True
@@ -328,7 +332,7 @@ class TelegramWorker:
                 if thread_id or self.thread_id:
                     payload["message_thread_id"] = thread_id or self.thread_id
 
-                response = requests.post(url, json=payload, timeout=30)
+                response = telegram_session.post(url, json=payload, timeout=30)
 
                 if response.status_code == 200:
                     return True
@@ -338,7 +342,7 @@ class TelegramWorker:
                     if "message_thread_id" in payload:
                         logger.info("[TW] Thread not found, retrying without thread_id...")
                         payload.pop("message_thread_id")
-                        response = requests.post(url, json=payload, timeout=30)
+                        response = telegram_session.post(url, json=payload, timeout=30)
                         if response.status_code == 200:
                             logger.info("[TW] ✅ Message sent successfully (without thread)")
                             return True
@@ -384,7 +388,7 @@ class TelegramWorker:
             if self.thread_id:
                 payload["message_thread_id"] = self.thread_id
 
-            response = requests.post(url, json=payload, timeout=30)
+            response = telegram_session.post(url, json=payload, timeout=30)
 
             return response.status_code == 200
 
@@ -459,9 +463,7 @@ class TelegramWorker:
 
         except Exception as e:
             error_msg = f"CRITICAL ERROR in process_pending_notifications: {str(e)}"
-            logger.error(f"[TW] ❌ {error_msg}")
-            import traceback
-            logger.error(f"[TW] Traceback:\n{traceback.format_exc()}")
+            logger.exception(f"[TW] ❌ {error_msg}")
             self.db.add_log_entry('ERROR', f'[TW.process] CRITICAL: {error_msg[:200]}', 'telegram')
             stats['errors'].append(error_msg)
 
@@ -469,6 +471,30 @@ class TelegramWorker:
 
 
 # Synchronous wrapper functions
+_telegram_worker = None
+_telegram_worker_lock = threading.Lock()
+
+
+def get_telegram_worker() -> TelegramWorker:
+    """
+    Get shared TelegramWorker, rebuilt only when bot token / chat / thread change
+
+    Config is not reloaded here: the worker's scheduler loop and the web process's config
+    refresher thread keep it current, so request handlers never pay for a DB reload.
+
+    Raises:
+        ValueError: If Telegram is not configured (same as TelegramWorker())
+    """
+    global _telegram_worker
+    credentials = (config.TELEGRAM_BOT_TOKEN, config.TELEGRAM_CHAT_ID, config.TELEGRAM_THREAD_ID)
+
+    with _telegram_worker_lock:
+        worker = _telegram_worker
+        if worker is None or (worker.bot_token, worker.chat_id, worker.thread_id) != credentials:
+            worker = _telegram_worker = TelegramWorker()
+        return worker
+
+
 def send_notification_for_item(item: Dict[str, Any]) -> bool:
     """
     Send notification for single item
@@ -479,7 +505,7 @@ def send_notification_for_item(item: Dict[str, Any]) -> bool:
     Returns:
         True if sent successfully
     """
-    worker = TelegramWorker()
+    worker = get_telegram_worker()
     return worker.send_item_notification(item)
 
 
@@ -493,7 +519,7 @@ def send_notifications(items: List[Dict[str, Any]]) -> Dict[str, int]:
     Returns:
         Dictionary with statistics
     """
-    worker = TelegramWorker()
+    worker = get_telegram_worker()
 
     stats = {
         'total': len(items),
@@ -525,20 +551,18 @@ def process_pending_notifications(max_items: int = 35) -> Dict[str, int]:
         Dictionary with statistics
     """
     try:
-        logger.info("[TW] Creating TelegramWorker instance...")
-        worker = TelegramWorker()
-        logger.info("[TW] TelegramWorker created successfully")
+        logger.info("[TW] Getting TelegramWorker instance...")
+        worker = get_telegram_worker()
+        logger.info("[TW] TelegramWorker ready")
         result = worker.process_pending_notifications(max_items=max_items)
         # Only log if there were items to send
         if result.get('total', 0) > 0:
             logger.info(f"[TW] Sent {result['sent']}/{result['total']} items")
         return result
     except Exception as e:
-        logger.error(f"[TW] Failed to create TelegramWorker: {e}")
-        import traceback
-        error_msg = f"[TW] Failed: {e}\n{traceback.format_exc()}"
-        logger.error(f"[TW] Traceback:\n{traceback.format_exc()}")
-        from db import get_db
+        tb = traceback.format_exc()
+        logger.error(f"[TW] Failed to create TelegramWorker: {e}\n{tb}")
+        error_msg = f"[TW] Failed: {e}\n{tb}"
         get_db().add_log_entry('ERROR', error_msg[:500], 'telegram')
         return {'total': 0, 'sent': 0, 'failed': 0}
 
@@ -553,7 +577,7 @@ def send_system_message(message: str) -> bool:
     Returns:
         True if sent successfully
     """
-    worker = TelegramWorker()
+    worker = get_telegram_worker()
     return worker.send_system_message(message)
 
 
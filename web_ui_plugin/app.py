@@ -3,25 +3,80 @@ Flask Web UI for MercariSearcher
 Adapted from KufarSearcher
 """
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, send_file
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.local import LocalProxy
+from werkzeug.http import unquote_etag
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import asyncio
+import threading
+import time
+import uuid
 import sys
 import os
-import json
+import hashlib
+import re
+import shutil
+import io
+import traceback
+from collections import OrderedDict
+from types import MappingProxyType
+
+import aiohttp
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import schedule
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from db import get_db
-from configuration_values import config
+from db import get_db, MOSCOW_TZ, FORCE_SCAN_REQUEST_KEY
+from configuration_values import config, start_config_refresher
 from shared_state import get_shared_state
-from core import validate_search_url
+from image_handler import decode_data_uri
+from simple_telegram_worker import get_telegram_worker, process_pending_notifications, send_system_message
+from railway_redeploy import railway_session
+# core (scraper, pyMercariAPI) and proxies (validates every proxy at import) are imported inside
+# the few handlers that need them, so a web-only process never loads scraper code at boot
 
 logger = logging.getLogger(__name__)
 
+# Optional uvloop (not available on Windows): faster event loop for asyncio.run() in the
+# proxy test and async image lookups
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """jsonify() backed by orjson - serialises datetimes natively and writes bytes directly"""
+    # Naive datetimes are labelled UTC like Flask's default provider did, so found_at output is unchanged
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
+    def dumps(self, obj, **kwargs):
+        option = self.option | (orjson.OPT_SORT_KEYS if kwargs.get('sort_keys') else 0)
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self.option)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.config['SECRET_KEY'] = config.SECRET_KEY
+# Templates are compiled once at import (see warm_templates) and never re-checked on disk in production
+app.config['TEMPLATES_AUTO_RELOAD'] = config.WEB_UI_DEBUG
 
 # Basic Auth Configuration
 app.config['BASIC_AUTH_USERNAME'] = config.WEB_USERNAME
@@ -31,9 +86,42 @@ app.config['BASIC_AUTH_FORCE'] = True  # Protect entire app
 from flask_basicauth import BasicAuth
 basic_auth = BasicAuth(app)
 
+# Response compression (item lists are large JSON payloads)
+app.config['COMPRESS_MIMETYPES'] = ['application/json', 'text/html']
+app.config['COMPRESS_MIN_SIZE'] = 500
+app.config['COMPRESS_LEVEL'] = 6
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']  # Brotli first - smaller JSON at similar CPU cost
+app.config['COMPRESS_BR_LEVEL'] = 4
+
+from flask_compress import Compress
+compress = Compress(app)
+
+# Short-TTL cache for dashboard aggregates (Redis when configured, else in-process)
+app.config['CACHE_TYPE'] = 'RedisCache' if config.REDIS_URL else 'SimpleCache'
+app.config['CACHE_REDIS_URL'] = config.REDIS_URL
+app.config['CACHE_DEFAULT_TIMEOUT'] = config.DASHBOARD_CACHE_TIMEOUT
+
+from flask_caching import Cache
+cache = Cache(app)
+
+DASHBOARD_CACHE_KEYS = ('dashboard', 'api_stats', 'dashboard_bundle', 'items_fingerprint')
+
 # Database and state
-db = get_db()
-shared_state = get_shared_state()
+# Resolved lazily on first use: importing the app (gunicorn boot) no longer opens
+# the DB connection, so a slow or unavailable database can't block worker startup
+db = LocalProxy(get_db)
+shared_state = LocalProxy(get_shared_state)
+
+# Background jobs (manual scan, scan after clear, cron search cycle, test notification, redeploy)
+# run off the request thread on a small shared pool - at most one in-flight job per kind
+_job_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='BackgroundJob')
+_jobs = {}  # job_id -> {'kind': ..., 'future': ...}
+_active_jobs = {}  # kind -> job_id of most recent job
+_jobs_lock = threading.Lock()
+MAX_TRACKED_JOBS = 20
+# Every full scan (Scan now, rescan after clear, cron /api/trigger-search) shares one job kind,
+# so two search_all_queries passes never run at the same time
+SCAN_JOB_KIND = 'scan'
 
 
 # Jinja2 custom filter for cleaning timestamps
@@ -43,21 +131,33 @@ def clean_timestamp_filter(ts):
     return clean_timestamp(str(ts)) if ts else ''
 
 
+class SafeConfig:
+    """Read-through view of config for templates (no per-request copy, never stale after hot reload)"""
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name == 'USD_CONVERSION_RATE':
+            return config.USD_CONVERSION_RATE or 0.0067
+        return getattr(config, name)
+
+
+SAFE_CONFIG = SafeConfig()
+
+
 def get_safe_config():
     """Get config with fallback for USD_CONVERSION_RATE"""
-    safe_config = type('SafeConfig', (object,), {
-        'USD_CONVERSION_RATE': config.USD_CONVERSION_RATE or 0.0067
-    })()
+    return SAFE_CONFIG
 
-    # Copy all other config attributes
-    for attr in dir(config):
-        if not attr.startswith('_') and attr != 'USD_CONVERSION_RATE':
-            try:
-                setattr(safe_config, attr, getattr(config, attr))
-            except:
-                pass
 
-    return safe_config
+# Search fields that can come from the request body or be parsed from the search URL
+SEARCH_URL_FIELDS = ('keyword', 'min_price', 'max_price', 'category_id', 'brand', 'condition', 'size')
+
+
+def merge_search_fields(data, validation, fields=SEARCH_URL_FIELDS):
+    """Merge request fields over URL-parsed fields (explicit non-empty values win)"""
+    return {key: data.get(key) or validation.get(key) for key in fields}
 
 
 def clean_timestamp(ts_str):
@@ -66,26 +166,217 @@ def clean_timestamp(ts_str):
         return ts_str
 
     # Remove microseconds (e.g., "2025-11-19 22:43:32.585535" -> "2025-11-19 22:43:32")
-    if '.' in ts_str:
-        # Split at dot and keep only the part before it
-        parts = ts_str.split('.')
-        if len(parts) == 2:
-            # Check if there's a timezone after microseconds
-            if ' ' in parts[1]:
-                # e.g., ".585535 GMT+3" -> " GMT+3"
-                tz_part = parts[1].split(' ', 1)[1] if ' ' in parts[1] else ''
-                return f"{parts[0]} {tz_part}".strip() if tz_part else parts[0]
-            else:
-                return parts[0]
+    head, dot, rest = ts_str.partition('.')
+    if not dot or '.' in rest:
+        return ts_str
+
+    # Keep a timezone after the microseconds (e.g., ".585535 GMT+3" -> " GMT+3")
+    tz_part = rest.partition(' ')[2]
+    return f"{head} {tz_part}".strip() if tz_part else head
+
+
+def submit_job(kind, fn, *args):
+    """
+    Run fn in the background unless a job of the same kind is still running
+
+    Returns:
+        (job_id, created) - created is False when the in-flight job was reused
+    """
+    with _jobs_lock:
+        active = _jobs.get(_active_jobs.get(kind))
+        if active and not active['future'].done():
+            return _active_jobs[kind], False
+
+        job_id = uuid.uuid4().hex
+        _jobs[job_id] = {'kind': kind, 'future': _job_executor.submit(fn, *args)}
+        _active_jobs[kind] = job_id
+
+        # Forget oldest jobs so the registry stays bounded
+        while len(_jobs) > MAX_TRACKED_JOBS:
+            _jobs.pop(next(iter(_jobs)))
+
+        return job_id, True
+
+
+def get_running_jobs():
+    """Get {kind: job_id} for jobs that are still running"""
+    with _jobs_lock:
+        return {kind: job_id for kind, job_id in _active_jobs.items()
+                if job_id in _jobs and not _jobs[job_id]['future'].done()}
+
+
+def is_cacheable_response(rv):
+    """Only cache plain successful responses (error handlers return (body, status) tuples)"""
+    return not isinstance(rv, tuple)
+
+
+def dashboard_bundle():
+    """Dashboard statistics shared by / and /api/stats - one DB round-trip per cache window"""
+    bundle = cache.get('dashboard_bundle')
+    if bundle is None:
+        bundle = db.get_dashboard_bundle()
+        cache.set('dashboard_bundle', bundle)
+    return bundle
+
+
+def invalidate_dashboard_cache():
+    """Drop cached dashboard aggregates after actions that change them"""
+    try:
+        cache.delete_many(*DASHBOARD_CACHE_KEYS)
+    except Exception as e:
+        logger.warning(f"Failed to invalidate dashboard cache: {e}")
+
+
+def invalidate_config_cache():
+    """Drop the cached /config page after settings are saved"""
+    try:
+        cache.delete('configuration')
+    except Exception as e:
+        logger.warning(f"Failed to invalidate config cache: {e}")
+
+
+# Parsed category blacklist, reused while the stored row's updated_at is unchanged
+_blacklist_cache = {'version': None, 'list': [], 'set': frozenset()}
+_blacklist_lock = threading.Lock()
 
-    return ts_str
+
+def load_category_blacklist():
+    """Current blacklist as (list copy, frozenset) - DB value is parsed only when it changed"""
+    version = db.load_config_version('config_category_blacklist')
+    with _blacklist_lock:
+        if version is not None and version == _blacklist_cache['version']:
+            return list(_blacklist_cache['list']), _blacklist_cache['set']
+
+    blacklist = db.load_config('config_category_blacklist', default=[])
+    if isinstance(blacklist, str):
+        try:
+            blacklist = orjson.loads(blacklist)
+        except Exception as e:
+            logger.error(f"[BLACKLIST] Failed to parse JSON: {e}")
+            blacklist = []
+    if not isinstance(blacklist, list):
+        blacklist = []
+    # Drop duplicates left by older saves (keeps first-seen order); the next write persists it
+    blacklist = list(dict.fromkeys(blacklist))
+
+    with _blacklist_lock:
+        _blacklist_cache.update(version=version, list=blacklist, set=frozenset(blacklist))
+    return list(blacklist), _blacklist_cache['set']
+
+
+def forget_category_blacklist():
+    """Make the next load_category_blacklist() re-read the DB (after a save)"""
+    with _blacklist_lock:
+        _blacklist_cache['version'] = None
+
+
+def coerce_config_value(value):
+    """Type a stored config value without exception-driven parsing
+
+    get_all_config() already JSON-decodes values, so only plain strings need a look.
+    """
+    if not isinstance(value, str):
+        return value
+    lowered = value.lower()
+    if lowered in ('true', 'false'):
+        return lowered == 'true'
+    stripped = value.strip()
+    # At most one sign - lstrip('-') would pass "--5" through to int() and raise
+    if stripped.removeprefix('-').isdecimal():
+        return int(stripped)
+    return value
+
+
+MAX_ITEMS_PAGE_SIZE = 200  # Upper bound for ?limit= on item listings
+
+
+def get_page_args(default_limit):
+    """Read limit/offset/after_id query args with limit capped to MAX_ITEMS_PAGE_SIZE"""
+    limit = max(1, min(request.args.get('limit', default_limit, type=int), MAX_ITEMS_PAGE_SIZE))
+    offset = max(0, request.args.get('offset', 0, type=int))
+    after_id = request.args.get('after_id', None, type=int)
+    return limit, offset, after_id
+
+
+ITEMS_FINGERPRINT_TTL = 2  # Seconds - concurrent pollers share one fingerprint query
+
+
+def items_etag(limit, offset, after_id):
+    """ETag for one item listing page - changes when items are added, deleted or sent"""
+    fingerprint = cache.get('items_fingerprint')
+    if fingerprint is None:
+        fingerprint = db.get_items_fingerprint()
+        cache.set('items_fingerprint', fingerprint, timeout=ITEMS_FINGERPRINT_TTL)
+    return (f"items-{fingerprint['max_id']}-{fingerprint['total']}-{fingerprint['sent']}"
+            f"-{limit}-{offset}-{after_id}")
+
+
+STREAM_CHUNK_ROWS = 50  # Rows serialised per yielded chunk (one socket write each)
+
+
+def stream_items_json(items, **extra):
+    """Yield {"success": true, "items": [...], **extra} in row chunks (no full-body buffer)"""
+    def dumps(obj):
+        return orjson.dumps(obj, default=app.json.default, option=app.json.option)
+
+    yield b'{"success":true,"items":['
+    for start in range(0, len(items), STREAM_CHUNK_ROWS):
+        chunk = b','.join(dumps(item) for item in items[start:start + STREAM_CHUNK_ROWS])
+        yield b',' + chunk if start else chunk
+    yield b']'
+    for key, value in extra.items():
+        yield b',' + dumps(key) + b':' + dumps(value)
+    yield b'}'
+
+
+def etag_matches(etag):
+    """Check If-None-Match header (Flask-Compress appends ':gzip' to ETags)"""
+    client_tags = request.if_none_match.as_set(include_weak=True)
+    return any(tag.split(':', 1)[0] == etag for tag in client_tags)
+
+
+def payload_etag(payload, volatile=('timestamp',)):
+    """ETag from JSON payload content, ignoring fields that change on every request"""
+    stable = {key: value for key, value in payload.items() if key not in volatile}
+    body = orjson.dumps(stable, default=str, option=app.json.option | orjson.OPT_SORT_KEYS)
+    return hashlib.md5(body).hexdigest()
+
+
+# Polled GET APIs: short private caching + 304 when the client's ETag still matches
+CONDITIONAL_ENDPOINTS = ('api_stats', 'api_get_items', 'api_get_recent_items')
+POLL_CACHE_CONTROL = 'private, max-age=3, stale-while-revalidate=10'
+
+
+def not_modified(etag):
+    """Empty 304 that repeats the ETag the 200 would have carried (RFC 9110)"""
+    response = app.response_class(status=304)
+    response.set_etag(etag)
+    return response
+
+
+@app.after_request
+def add_conditional_headers(response):
+    """Attach Cache-Control to polled APIs and turn matching ETags into 304s"""
+    if request.method != 'GET' or request.endpoint not in CONDITIONAL_ENDPOINTS:
+        return response
+    if response.status_code not in (200, 304):
+        return response
+
+    response.headers['Cache-Control'] = POLL_CACHE_CONTROL
+    etag, _ = response.get_etag()
+    if response.status_code == 200 and etag and etag_matches(etag):
+        response = not_modified(etag)
+        response.headers['Cache-Control'] = POLL_CACHE_CONTROL
+    return response
 
 
 @app.route('/')
+@cache.cached(key_prefix='dashboard', response_filter=is_cacheable_response)
 def index():
     """Dashboard"""
     try:
-        stats = db.get_statistics()
+        # Statistics + API counter in a single DB round-trip (shared with /api/stats)
+        stats = dashboard_bundle()
         # Try to get shared_state stats with timeout fallback
         try:
             state_stats = shared_state.get_stats_summary()
@@ -107,11 +398,10 @@ def index():
         return render_template('dashboard.html',
                              stats=stats,
                              state_stats=state_stats,
-                             total_api_requests=db.get_api_counter(),
+                             total_api_requests=stats['api_request_count'],
                              config=get_safe_config())
     except Exception as e:
         logger.error(f"Dashboard error: {e}")
-        import traceback
         logger.error(traceback.format_exc())
         db.log_error(f"Dashboard error: {str(e)}", 'web_ui')
         return f"Error: {e}", 500
@@ -125,7 +415,6 @@ def queries():
         return render_template('queries.html', searches=searches, config=get_safe_config())
     except Exception as e:
         logger.error(f"Queries page error: {e}")
-        import traceback
         logger.error(traceback.format_exc())
         db.log_error(f"Queries page error: {str(e)}", 'web_ui')
         return f"Error: {e}", 500
@@ -135,18 +424,18 @@ def queries():
 def items():
     """Items list"""
     try:
-        limit = request.args.get('limit', 100, type=int)
-        all_items = db.get_all_items(limit=limit)
+        limit, offset, after_id = get_page_args(100)
+        all_items = db.get_all_items(limit=limit, offset=offset, after_id=after_id)
         return render_template('items.html', items=all_items, config=get_safe_config())
     except Exception as e:
         logger.error(f"Items page error: {e}")
-        import traceback
         logger.error(traceback.format_exc())
         db.log_error(f"Items page error: {str(e)}", 'web_ui')
         return f"Error: {e}", 500
 
 
 @app.route('/config')
+@cache.cached(timeout=10, key_prefix='configuration')
 def configuration():
     """Configuration page"""
     # Load config from database
@@ -155,18 +444,7 @@ def configuration():
         all_config = db.get_all_config()
         for key, value in all_config.items():
             # Remove 'config_' prefix if present
-            clean_key = key.replace('config_', '')
-            # Try to convert to appropriate type
-            try:
-                # Try int first
-                config_dict[clean_key] = int(value)
-            except (ValueError, TypeError):
-                # Try bool
-                if isinstance(value, str) and value.lower() in ('true', 'false'):
-                    config_dict[clean_key] = value.lower() == 'true'
-                else:
-                    # Keep as string
-                    config_dict[clean_key] = value
+            config_dict[key.replace('config_', '')] = coerce_config_value(value)
     except Exception as e:
         logger.error(f"Error loading config from database: {e}")
 
@@ -176,9 +454,8 @@ def configuration():
     # Load category blacklist from DB
     category_blacklist = config_dict.get('category_blacklist', [])
     if isinstance(category_blacklist, str):
-        import json
         try:
-            category_blacklist = json.loads(category_blacklist)
+            category_blacklist = orjson.loads(category_blacklist)
         except:
             category_blacklist = []
     
@@ -207,41 +484,33 @@ def configuration():
     return render_template('config.html', config=final_config)
 
 
+LOG_TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S GMT+3'
+
+
 @app.route('/logs')
 def logs():
     """Logs page"""
     try:
-        import pytz
-        from datetime import datetime
-
         # Limit to 300 logs by default for fast page load
         limit = request.args.get('limit', 300, type=int)
         limit = min(limit, 500)  # Max 500 to avoid performance issues
         level = request.args.get('level', None)
         all_logs = db.get_logs(limit=limit, level=level)
 
-        # Format timestamps to Moscow timezone (GMT+3)
-        MOSCOW_TZ = pytz.timezone('Europe/Moscow')
-        formatted_logs = []
+        # Format timestamps to Moscow timezone (GMT+3) in place - rows are fresh dicts from the DB
         for log in all_logs:
-            log_copy = dict(log)
-            if log_copy.get('timestamp'):
-                ts = log_copy['timestamp']
-                # If timestamp is timezone-aware, convert to Moscow time
-                if isinstance(ts, datetime):
-                    if ts.tzinfo is None:
-                        # Assume it's already Moscow time from database
-                        ts = MOSCOW_TZ.localize(ts)
-                    else:
-                        ts = ts.astimezone(MOSCOW_TZ)
-                    # Format as "YYYY-MM-DD HH:MM:SS GMT+3" (no microseconds)
-                    log_copy['timestamp'] = ts.strftime('%Y-%m-%d %H:%M:%S GMT+3')
-                elif isinstance(ts, str):
-                    # Already formatted, but clean microseconds
-                    log_copy['timestamp'] = clean_timestamp(ts)
-            formatted_logs.append(log_copy)
-
-        return render_template('logs.html', logs=formatted_logs, config=get_safe_config())
+            ts = log.get('timestamp')
+            if isinstance(ts, datetime):
+                # Naive timestamps are already Moscow time from database; aware ones are converted
+                if ts.tzinfo is not None:
+                    ts = ts.astimezone(MOSCOW_TZ)
+                # Format as "YYYY-MM-DD HH:MM:SS GMT+3" (no microseconds)
+                log['timestamp'] = ts.strftime(LOG_TIMESTAMP_FORMAT)
+            elif isinstance(ts, str):
+                # Already formatted, but clean microseconds
+                log['timestamp'] = clean_timestamp(ts)
+
+        return render_template('logs.html', logs=all_logs, config=get_safe_config())
     except Exception as e:
         logger.error(f"Logs page error: {e}")
         return f"Error: {e}", 500
@@ -253,9 +522,7 @@ def logs():
 def api_telegram_status():
     """Check Telegram configuration status"""
     try:
-        # Force reload config from DB
-        config.reload_if_needed()
-
+        # Config is hot-reloaded by the background refresher - just read it
         status = {
             'configured': bool(config.TELEGRAM_BOT_TOKEN and config.TELEGRAM_CHAT_ID),
             'bot_token_set': bool(config.TELEGRAM_BOT_TOKEN),
@@ -268,8 +535,7 @@ def api_telegram_status():
 
         # Try to initialize TelegramWorker to test
         try:
-            from simple_telegram_worker import TelegramWorker
-            worker = TelegramWorker()
+            worker = get_telegram_worker()
             status['worker_initialized'] = True
             status['error'] = None
         except Exception as e:
@@ -290,27 +556,33 @@ def api_telegram_status():
 def api_error_logs():
     """Get ERROR level logs and scheduler/wsgi logs from database"""
     try:
-        # Query database for ERROR logs
+        # ERROR logs + wsgi/scheduler/telegram logs (by message prefix) in one round-trip;
+        # subqueries keep each bucket's own ORDER BY/LIMIT (portable to SQLite)
         query = """
-            SELECT timestamp, level, message
-            FROM logs
-            WHERE level = 'ERROR'
-            ORDER BY timestamp DESC
-            LIMIT 50
-        """
-        error_logs = db.execute_query(query, fetch=True)
-
-        # Get wsgi and scheduler logs (by message prefix)
-        query2 = """
-            SELECT timestamp, level, message
-            FROM logs
-            WHERE message LIKE '[wsgi]%' OR message LIKE '[WSGI]%'
-               OR message LIKE '[scheduler]%' OR message LIKE '[SCHEDULER]%'
-               OR message LIKE '[telegram]%' OR message LIKE '[TELEGRAM]%'
-            ORDER BY timestamp DESC
-            LIMIT 100
+            SELECT * FROM (
+                SELECT 'error' as bucket, timestamp, level, message
+                FROM logs
+                WHERE level = 'ERROR'
+                ORDER BY timestamp DESC
+                LIMIT 50
+            ) error_logs
+            UNION ALL
+            SELECT * FROM (
+                SELECT 'category' as bucket, timestamp, level, message
+                FROM logs
+                WHERE message LIKE '[wsgi]%' OR message LIKE '[WSGI]%'
+                   OR message LIKE '[scheduler]%' OR message LIKE '[SCHEDULER]%'
+                   OR message LIKE '[telegram]%' OR message LIKE '[TELEGRAM]%'
+                ORDER BY timestamp DESC
+                LIMIT 100
+            ) category_logs
+            ORDER BY bucket, timestamp DESC
         """
-        category_logs = db.execute_query(query2, fetch=True)
+        error_logs = []
+        category_logs = []
+        for row in db.execute_query(query, fetch=True) or []:
+            bucket = row.pop('bucket')
+            (error_logs if bucket == 'error' else category_logs).append(row)
 
         return jsonify({
             'success': True,
@@ -321,7 +593,6 @@ def api_error_logs():
         })
 
     except Exception as e:
-        import traceback
         logger.error(traceback.format_exc())
         return jsonify({
             'success': False,
@@ -336,7 +607,6 @@ def api_force_telegram_cycle():
         logger.info("[API] Forcing telegram_cycle...")
 
         # Call process_pending_notifications directly (don't create full app instance)
-        from simple_telegram_worker import process_pending_notifications
 
         stats = process_pending_notifications(max_items=5)
 
@@ -347,7 +617,6 @@ def api_force_telegram_cycle():
         })
 
     except Exception as e:
-        import traceback
         logger.error(traceback.format_exc())
         return jsonify({
             'success': False,
@@ -359,8 +628,6 @@ def api_force_telegram_cycle():
 def api_scheduler_status():
     """Get scheduler status and job information"""
     try:
-        import schedule
-
         jobs = schedule.get_jobs()
 
         job_info = []
@@ -381,7 +648,6 @@ def api_scheduler_status():
         })
 
     except Exception as e:
-        import traceback
         logger.error(traceback.format_exc())
         return jsonify({
             'success': False,
@@ -393,8 +659,6 @@ def api_scheduler_status():
 def api_scheduler_heartbeat():
     """Get scheduler heartbeat from database - used by Web UI to check if scheduler is alive"""
     try:
-        from datetime import datetime, timedelta
-
         # Read heartbeat from database
         heartbeat_str = db.load_config('scheduler_heartbeat')
 
@@ -439,7 +703,6 @@ def api_scheduler_heartbeat():
         })
 
     except Exception as e:
-        import traceback
         return jsonify({
             'success': False,
             'alive': False,
@@ -469,8 +732,7 @@ def api_test_telegram_send():
         logger.info(f"[API] Item ID: {test_item.get('id')}")
 
         # Try to send ONE item
-        from simple_telegram_worker import TelegramWorker
-        worker = TelegramWorker()
+        worker = get_telegram_worker()
 
         success = worker.send_item_notification(test_item)
 
@@ -485,7 +747,6 @@ def api_test_telegram_send():
 
     except Exception as e:
         logger.error(f"[API] Telegram test failed: {e}")
-        import traceback
         error_trace = traceback.format_exc()
         logger.error(f"[API] Traceback:\n{error_trace}")
 
@@ -496,25 +757,23 @@ def api_test_telegram_send():
         })
 
 @app.route('/api/stats')
+@cache.cached(key_prefix='api_stats', response_filter=is_cacheable_response)
 def api_stats():
     """Get statistics API - formatted for auto-refresh"""
     try:
-        import datetime as dt
-
-        db_stats = db.get_statistics()
+        # Statistics + API counter in a single DB round-trip (cross-process visibility)
+        db_stats = dashboard_bundle()
 
-        # Try to get shared state stats
+        # Only uptime is needed from shared state - skip building the full summary dict
         try:
-            state_stats = shared_state.get_stats_summary()
-            uptime_formatted = state_stats.get('uptime', 'N/A')
+            uptime_formatted = shared_state.get_uptime_formatted()
         except Exception as e:
             logger.warning(f"Shared state unavailable: {e}")
             uptime_formatted = "N/A (web-only)"
 
-        # Get API request count from database (cross-process visibility)
-        total_api_requests = db.get_api_counter()
+        total_api_requests = db_stats['api_request_count']
 
-        return jsonify({
+        payload = {
             'success': True,
             'database': {
                 'total_items': db_stats.get('total_items', 0),
@@ -523,8 +782,13 @@ def api_stats():
             },
             'total_api_requests': total_api_requests,
             'uptime_formatted': uptime_formatted,
-            'timestamp': datetime.now().isoformat()
-        })
+            'running_jobs': get_running_jobs(),
+            'timestamp': datetime.now().astimezone()
+        }
+        response = jsonify(payload)
+        # ETag ignores 'timestamp'; add_conditional_headers() answers 304 on match
+        response.set_etag(payload_etag(payload))
+        return response
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -533,8 +797,6 @@ def api_stats():
 def api_category_stats():
     """Get detailed category statistics for items - OPTIMIZED (1 aggregated query instead of 11)"""
     try:
-        from datetime import timedelta
-
         # Check if category_id column exists (PostgreSQL) or use category (SQLite/old schema)
         has_category_id = db.has_column('items', 'category_id')
 
@@ -643,7 +905,6 @@ def api_category_stats():
         })
     except Exception as e:
         logger.error(f"[API] /api/category-stats error: {e}")
-        import traceback
         traceback.print_exc()
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -652,15 +913,9 @@ def api_category_stats():
 def api_get_queries():
     """Get all queries with actual item counts"""
     try:
-        searches = db.get_all_searches()
-        
-        # Add real item count for each search
-        for search in searches:
-            # Count items for this search_id
-            count_query = "SELECT COUNT(*) as count FROM items WHERE search_id = %s"
-            result = db.execute_query(count_query, (search['id'],), fetch=True)
-            search['items_count'] = result[0]['count'] if result else 0
-        
+        # Item counts come from one GROUP BY join (uses idx_items_search_id)
+        searches = db.get_all_searches_with_counts()
+
         return jsonify({'success': True, 'queries': searches})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -681,6 +936,7 @@ def api_add_query():
 
         # Validate URL
         logger.info(f"[API] Validating URL: {search_url}")
+        from core import validate_search_url
         validation = validate_search_url(search_url)
         if not validation.get('valid'):
             logger.error(f"[API] URL validation failed: {validation.get('error')}")
@@ -692,22 +948,16 @@ def api_add_query():
             search_url=search_url,
             name=data.get('name'),
             thread_id=data.get('thread_id'),
-            keyword=data.get('keyword') or validation.get('keyword'),
-            min_price=data.get('min_price') or validation.get('min_price'),
-            max_price=data.get('max_price') or validation.get('max_price'),
-            category_id=data.get('category_id') or validation.get('category_id'),
-            brand=data.get('brand') or validation.get('brand'),
-            condition=data.get('condition') or validation.get('condition'),
-            size=data.get('size') or validation.get('size'),
-            notify_on_price_drop=data.get('notify_on_price_drop', False)
+            notify_on_price_drop=data.get('notify_on_price_drop', False),
+            **merge_search_fields(data, validation)
         )
 
         logger.info(f"[API] ✅ Query added successfully! ID: {search_id}")
+        invalidate_dashboard_cache()
         return jsonify({'success': True, 'message': 'Query added successfully', 'id': search_id})
 
     except Exception as e:
         logger.error(f"[API] ❌ Error adding query: {e}")
-        import traceback
         logger.error(traceback.format_exc())
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -735,6 +985,7 @@ def api_update_query(query_id):
             return jsonify({'success': False, 'error': 'search_url required'}), 400
 
         # Validate URL
+        from core import validate_search_url
         validation = validate_search_url(search_url)
         if not validation.get('valid'):
             return jsonify({'success': False, 'error': validation.get('error', 'Invalid URL')}), 400
@@ -744,7 +995,7 @@ def api_update_query(query_id):
             'search_url': search_url,
             'name': data.get('name'),
             'thread_id': data.get('thread_id'),
-            'keyword': data.get('keyword') or validation.get('keyword')
+            **merge_search_fields(data, validation, ('keyword',))
         }
         
         # Note: scan_limit and scan_interval are now configured globally in config
@@ -783,17 +1034,24 @@ def api_delete_query(query_id):
 def api_get_items():
     """Get items API - WITHOUT heavy image_data for fast loading"""
     try:
-        limit = request.args.get('limit', 50, type=int)
-        offset = request.args.get('offset', 0, type=int)
-        all_items = db.get_all_items(limit=limit, offset=offset)
-        
-        # OPTIMIZATION: Remove heavy image_data from response
-        # Frontend will use image_url instead
-        for item in all_items:
-            if 'image_data' in item:
-                del item['image_data']  # Remove 100-500KB base64 data
-        
-        return jsonify({'success': True, 'items': all_items})
+        # Conditional GET: skip query + JSON encoding when nothing changed
+        limit, offset, after_id = get_page_args(50)
+        etag = items_etag(limit, offset, after_id)
+        if etag_matches(etag):
+            return not_modified(etag)
+
+        # get_all_items() never selects the heavy image_data column (frontend uses image_url)
+        all_items = db.get_all_items(limit=limit, offset=offset, after_id=after_id)
+
+        # Keyset cursor for the next page (pass back as ?after_id=)
+        next_after_id = min(item['id'] for item in all_items) if all_items else None
+
+        response = app.response_class(
+            stream_items_json(all_items, next_after_id=next_after_id),
+            mimetype='application/json'
+        )
+        response.set_etag(etag)
+        return response
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -802,28 +1060,23 @@ def api_get_items():
 def api_get_recent_items():
     """Get recent items for dashboard - WITHOUT heavy image_data"""
     try:
-        from datetime import datetime
-        import pytz
+        # Conditional GET: dashboard polls this even when nothing changed
+        limit, offset, after_id = get_page_args(30)
+        etag = items_etag(limit, offset, after_id)
+        if etag_matches(etag):
+            return not_modified(etag)
 
-        limit = request.args.get('limit', 30, type=int)
-        offset = request.args.get('offset', 0, type=int)
-        items = db.get_all_items(limit=limit, offset=offset)
-        
-        # OPTIMIZATION: Remove heavy image_data from response
-        # This makes API response 10-50x smaller!
-        for item in items:
-            if 'image_data' in item:
-                del item['image_data']  # Remove 100-500KB base64 data
-        
-        # Moscow timezone (GMT+3)
-        MOSCOW_TZ = pytz.timezone('Europe/Moscow')
+        # get_all_items() never selects the heavy image_data column (10-50x smaller response)
+        items = db.get_all_items(limit=limit, offset=offset, after_id=after_id)
 
-        return jsonify({
+        response = jsonify({
             'success': True,
             'items': items,
             'count': len(items),
-            'timestamp': datetime.now(MOSCOW_TZ).isoformat()
+            'timestamp': datetime.now(MOSCOW_TZ)
         })
+        response.set_etag(etag)
+        return response
     except Exception as e:
         logger.error(f"Error getting recent items: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -840,6 +1093,7 @@ def api_test_search():
             return jsonify({'valid': False, 'error': 'URL is required'}), 400
 
         # Validate URL
+        from core import validate_search_url
         result = validate_search_url(url)
 
         return jsonify(result)
@@ -848,53 +1102,97 @@ def api_test_search():
         return jsonify({'valid': False, 'error': str(e)}), 500
 
 
+def run_manual_scan():
+    """Run a full scan of all queries (executed on the manual scan executor)"""
+    try:
+        from core import MercariSearcher
+        searcher = MercariSearcher()
+        results = searcher.search_all_queries()
+
+        logger.info(f"✅ Force scan completed: {results}")
+        db.add_log_entry('INFO',
+            f"Manual scan completed: {results.get('new_items', 0)} new items found",
+            'api',
+            f"Total: {results.get('total_items_found', 0)}, Searches: {results.get('successful_searches', 0)}")
+        return results
+    except Exception as e:
+        logger.error(f"❌ Error in force scan thread: {e}")
+        db.add_log_entry('ERROR', f'Manual scan failed: {str(e)}', 'api')
+        raise
+
+
 @app.route('/api/force-scan', methods=['POST'])
 def api_force_scan():
     """Force scan all queries manually - runs in background to avoid timeout"""
     try:
         logger.info("🔍 Force scan triggered via API")
+
+        # Worker service picks the request up within a few seconds (repeated clicks coalesce)
+        if config.FORCE_SCAN_IN_WORKER:
+            if not db.save_config(FORCE_SCAN_REQUEST_KEY, datetime.now(MOSCOW_TZ).isoformat()):
+                return jsonify({'success': False, 'error': 'Failed to queue scan'}), 500
+            db.add_log_entry('INFO', 'Manual scan queued for worker from web UI', 'api')
+            return jsonify({
+                'success': True,
+                'queued': 'worker',
+                'message': 'Scan queued for the worker! Check logs for results.'
+            }), 202
+
+        # Queue scan as a background job (never blocks the request thread)
+        job_id, created = submit_job(SCAN_JOB_KIND, run_manual_scan)
+        if not created:
+            return jsonify({
+                'success': False,
+                'status': 'already_running',
+                'job_id': job_id,
+                'error': 'A scan is already running'
+            }), 409
+
         db.add_log_entry('INFO', 'Manual scan triggered from web UI', 'api')
+        invalidate_dashboard_cache()
 
-        # Run scanner in separate thread to avoid blocking Flask and asyncio conflicts
-        import threading
-        
-        def run_scan():
-            try:
-                from core import MercariSearcher
-                searcher = MercariSearcher()
-                results = searcher.search_all_queries()
-                
-                logger.info(f"✅ Force scan completed: {results}")
-                db.add_log_entry('INFO',
-                    f"Manual scan completed: {results.get('new_items', 0)} new items found",
-                    'api',
-                    f"Total: {results.get('total_items_found', 0)}, Searches: {results.get('successful_searches', 0)}")
-            except Exception as e:
-                logger.error(f"❌ Error in force scan thread: {e}")
-                db.add_log_entry('ERROR', f'Manual scan failed: {str(e)}', 'api')
-        
-        # Start scan in background thread
-        scan_thread = threading.Thread(target=run_scan, daemon=True)
-        scan_thread.start()
-        
         return jsonify({
             'success': True,
+            'job_id': job_id,
             'message': 'Scan started in background! Check logs for results.'
-        })
+        }), 202
     except Exception as e:
         logger.error(f"❌ Error starting force scan: {e}")
         db.add_log_entry('ERROR', f'Failed to start manual scan: {str(e)}', 'api')
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@app.route('/api/jobs/<job_id>')
+@app.route('/api/force-scan/status/<job_id>')
+def api_job_status(job_id):
+    """Get status of a background job"""
+    job = _jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+
+    future = job['future']
+    status = {'success': True, 'job_id': job_id, 'kind': job['kind'], 'done': future.done()}
+    if future.done():
+        error = future.exception()
+        status['error'] = str(error) if error else None
+        status['results'] = None if error else future.result()
+    return jsonify(status)
+
+
+NOTIFICATION_TEST_TIMEOUT = 35  # seconds (Telegram request timeout is 30s)
+
+
 @app.route('/api/notifications/test', methods=['POST'])
 def api_test_notification():
     """Send test Telegram notification"""
     try:
-        from simple_telegram_worker import send_system_message
-        
-        # Send test notification (synchronous, no asyncio)
-        result = send_system_message("🧪 Test notification from MercariSearcher Web UI")
+        # Repeated clicks join the in-flight send instead of sending duplicates
+        job_id, _ = submit_job('test_notification', send_system_message,
+                               "🧪 Test notification from MercariSearcher Web UI")
+        try:
+            result = _jobs[job_id]['future'].result(timeout=NOTIFICATION_TEST_TIMEOUT)
+        except FutureTimeoutError:
+            return jsonify({'success': False, 'job_id': job_id, 'error': 'Test notification still sending'}), 504
         
         if result:
             return jsonify({'success': True, 'message': 'Test notification sent successfully'})
@@ -905,10 +1203,31 @@ def api_test_notification():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+# Liveness body never changes - encode once at boot
+HEALTH_BODY = orjson.dumps({'status': 'ok', 'app': config.APP_NAME, 'version': config.APP_VERSION})
+NO_STORE = {'Cache-Control': 'no-store'}
+READINESS_TIMEOUT = 0.2  # Seconds to wait for SELECT 1
+
+# Dedicated thread so a hung DB call can't tie up the background job pool
+_readiness_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='Readiness')
+
+
 @app.route('/health')
 def health():
-    """Health check endpoint"""
-    return jsonify({'status': 'ok', 'app': config.APP_NAME, 'version': config.APP_VERSION})
+    """Health check endpoint (liveness - no DB access)"""
+    return Response(HEALTH_BODY, mimetype='application/json', headers=NO_STORE)
+
+
+@app.route('/readiness')
+def readiness():
+    """Readiness check - app is up AND database answers SELECT 1"""
+    try:
+        _readiness_executor.submit(db.execute_query, "SELECT 1", None, True, 1).result(timeout=READINESS_TIMEOUT)
+        return Response(HEALTH_BODY, mimetype='application/json', headers=NO_STORE)
+    except FutureTimeoutError:
+        return jsonify({'status': 'unavailable', 'error': 'Database timeout'}), 503, NO_STORE
+    except Exception as e:
+        return jsonify({'status': 'unavailable', 'error': str(e)}), 503, NO_STORE
 
 
 @app.route('/api/logs')
@@ -916,20 +1235,17 @@ def api_get_logs():
     """Get application logs from database"""
     try:
         category = request.args.get('category', None)
-        limit = request.args.get('limit', 50, type=int)
+        limit = min(request.args.get('limit', 50, type=int), 500)  # Same cap as db.get_logs()
 
-        query = """
-            SELECT id, timestamp, level, message
-            FROM logs
-            WHERE 1=1
-        """
+        query = "SELECT id, timestamp, level, message FROM logs"
         params = []
 
         # Filter by category in message (format: [category] message)
         if category:
-            query += " AND message LIKE %s"
+            query += " WHERE message LIKE %s"
             params.append(f"[{category}]%")
 
+        # Walks idx_logs_timestamp newest-first and stops after LIMIT rows (no full sort)
         query += " ORDER BY timestamp DESC LIMIT %s"
         params.append(limit)
 
@@ -945,30 +1261,29 @@ def api_get_logs():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-if __name__ == '__main__':
-    app.run(host=config.WEB_UI_HOST, port=config.PORT, debug=True)
+# ==================== CONFIG API ENDPOINTS ====================
 
+def save_config_bundle(section):
+    """Save posted settings as config_<key> values in one DB transaction"""
+    data = request.get_json()
+    # Full payload (may include tokens) only at DEBUG, formatted lazily
+    logger.debug("[CONFIG] /api/config/%s called with data: %s", section, data)
+
+    saved_count = db.save_config_many({f"config_{key}": value for key, value in data.items()})
+    if saved_count:
+        invalidate_config_cache()
+        logger.info("[CONFIG] ✅ Total saved: %s/%s", saved_count, len(data))
+    else:
+        logger.error(f"[CONFIG] ❌ Failed to save {section} config ({len(data)} keys)")
+
+    return saved_count
 
-# ==================== CONFIG API ENDPOINTS ====================
 
 @app.route('/api/config/system', methods=['POST'])
 def api_save_system_config():
     """Save system configuration"""
     try:
-        data = request.get_json()
-        logger.info(f"[CONFIG] /api/config/system called with data: {data}")
-
-        # Save each config value to database
-        saved_count = 0
-        for key, value in data.items():
-            logger.info(f"[CONFIG] Saving config_{key} = {value}")
-            if db.save_config(f"config_{key}", value):
-                saved_count += 1
-                logger.info(f"[CONFIG] ✅ Saved config_{key}")
-            else:
-                logger.error(f"[CONFIG] ❌ Failed to save config_{key}")
-
-        logger.info(f"[CONFIG] Total saved: {saved_count}/{len(data)}")
+        saved_count = save_config_bundle('system')
 
         return jsonify({
             'success': True,
@@ -977,7 +1292,6 @@ def api_save_system_config():
         })
     except Exception as e:
         logger.error(f"[CONFIG] ❌ Error saving system config: {e}")
-        import traceback
         logger.error(traceback.format_exc())
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -986,20 +1300,7 @@ def api_save_system_config():
 def api_save_telegram_config():
     """Save Telegram configuration"""
     try:
-        data = request.get_json()
-        logger.info(f"[CONFIG] /api/config/telegram called with data: {data}")
-
-        # Save each config value to database
-        saved_count = 0
-        for key, value in data.items():
-            logger.info(f"[CONFIG] Saving config_{key} = {value}")
-            if db.save_config(f"config_{key}", value):
-                saved_count += 1
-                logger.info(f"[CONFIG] ✅ Saved config_{key}")
-            else:
-                logger.error(f"[CONFIG] ❌ Failed to save config_{key}")
-
-        logger.info(f"[CONFIG] Total saved: {saved_count}/{len(data)}")
+        saved_count = save_config_bundle('telegram')
 
         return jsonify({
             'success': True,
@@ -1008,7 +1309,6 @@ def api_save_telegram_config():
         })
     except Exception as e:
         logger.error(f"[CONFIG] ❌ Error saving telegram config: {e}")
-        import traceback
         logger.error(traceback.format_exc())
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -1017,20 +1317,7 @@ def api_save_telegram_config():
 def api_save_proxy_config():
     """Save proxy configuration"""
     try:
-        data = request.get_json()
-        logger.info(f"[CONFIG] /api/config/proxy called with data: {data}")
-
-        # Save each config value to database
-        saved_count = 0
-        for key, value in data.items():
-            logger.info(f"[CONFIG] Saving config_{key} = {value}")
-            if db.save_config(f"config_{key}", value):
-                saved_count += 1
-                logger.info(f"[CONFIG] ✅ Saved config_{key}")
-            else:
-                logger.error(f"[CONFIG] ❌ Failed to save config_{key}")
-
-        logger.info(f"[CONFIG] Total saved: {saved_count}/{len(data)}")
+        saved_count = save_config_bundle('proxy')
 
         return jsonify({
             'success': True,
@@ -1039,7 +1326,6 @@ def api_save_proxy_config():
         })
     except Exception as e:
         logger.error(f"[CONFIG] ❌ Error saving proxy config: {e}")
-        import traceback
         logger.error(traceback.format_exc())
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -1048,20 +1334,7 @@ def api_save_proxy_config():
 def api_save_railway_config():
     """Save Railway configuration"""
     try:
-        data = request.get_json()
-        logger.info(f"[CONFIG] /api/config/railway called with data: {data}")
-
-        # Save each config value to database
-        saved_count = 0
-        for key, value in data.items():
-            logger.info(f"[CONFIG] Saving config_{key} = {value}")
-            if db.save_config(f"config_{key}", value):
-                saved_count += 1
-                logger.info(f"[CONFIG] ✅ Saved config_{key}")
-            else:
-                logger.error(f"[CONFIG] ❌ Failed to save config_{key}")
-
-        logger.info(f"[CONFIG] Total saved: {saved_count}/{len(data)}")
+        saved_count = save_config_bundle('railway')
 
         return jsonify({
             'success': True,
@@ -1070,7 +1343,6 @@ def api_save_railway_config():
         })
     except Exception as e:
         logger.error(f"[CONFIG] ❌ Error saving railway config: {e}")
-        import traceback
         logger.error(traceback.format_exc())
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -1104,35 +1376,28 @@ def api_restore_category_blacklist():
         ]
 
         # Load current blacklist
-        current_blacklist = db.load_config('config_category_blacklist', default=[])
-        logger.info(f"[BLACKLIST RESTORE] Current: {current_blacklist}")
-
-        # Convert to list if needed
-        if isinstance(current_blacklist, str):
-            try:
-                current_blacklist = json.loads(current_blacklist)
-            except:
-                current_blacklist = []
-
-        if not isinstance(current_blacklist, list):
-            current_blacklist = []
+        new_blacklist, current_set = load_category_blacklist()
+        logger.debug("[BLACKLIST RESTORE] Current: %s", new_blacklist)
 
         # Merge with original categories
-        new_blacklist = list(current_blacklist)
         added_count = 0
 
+        known = set(current_set)
         for category in ORIGINAL_CATEGORIES:
-            if category not in new_blacklist:
+            if category not in known:
+                known.add(category)
                 new_blacklist.append(category)
                 added_count += 1
-                logger.info(f"[BLACKLIST RESTORE] Added: {category}")
+                logger.debug("[BLACKLIST RESTORE] Added: %s", category)
 
-        logger.info(f"[BLACKLIST RESTORE] Added {added_count} categories, total: {len(new_blacklist)}")
+        logger.info("[BLACKLIST RESTORE] Added %s categories, total: %s", added_count, len(new_blacklist))
 
         # Save to database
-        blacklist_json = json.dumps(new_blacklist, ensure_ascii=False)
+        blacklist_json = orjson.dumps(new_blacklist).decode()
         if db.save_config('config_category_blacklist', blacklist_json):
             logger.info("[BLACKLIST RESTORE] ✅ Restoration successful!")
+            invalidate_config_cache()
+            forget_category_blacklist()
 
             # Trigger config reload
             if 'app' in globals() and hasattr(globals()['app'], 'notification_app'):
@@ -1154,7 +1419,6 @@ def api_restore_category_blacklist():
 
     except Exception as e:
         logger.error(f"[BLACKLIST RESTORE] ❌ Error: {e}")
-        import traceback
         logger.error(traceback.format_exc())
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -1167,17 +1431,19 @@ def api_migrate_category_blacklist():
 
         # Check if old key exists (without config_ prefix)
         old_key_value = db.load_config('category_blacklist')
-        logger.info(f"[BLACKLIST MIGRATE] Old key value: {old_key_value}")
+        logger.debug("[BLACKLIST MIGRATE] Old key value: %s", old_key_value)
 
         # Check current value in new key
         new_key_value = db.load_config('config_category_blacklist')
-        logger.info(f"[BLACKLIST MIGRATE] New key value: {new_key_value}")
+        logger.debug("[BLACKLIST MIGRATE] New key value: %s", new_key_value)
 
         if old_key_value and not new_key_value:
             # Migrate from old to new
             logger.info("[BLACKLIST MIGRATE] Migrating from old key to new key...")
-            if db.save_config('config_category_blacklist', json.dumps(old_key_value)):
+            if db.save_config('config_category_blacklist', orjson.dumps(old_key_value).decode()):
                 logger.info("[BLACKLIST MIGRATE] ✅ Migration successful!")
+                invalidate_config_cache()
+                forget_category_blacklist()
                 return jsonify({
                     'success': True,
                     'message': 'Migration successful',
@@ -1188,7 +1454,6 @@ def api_migrate_category_blacklist():
 
     except Exception as e:
         logger.error(f"[BLACKLIST MIGRATE] ❌ Error: {e}")
-        import traceback
         logger.error(traceback.format_exc())
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -1203,31 +1468,15 @@ def api_add_category_to_blacklist():
         if not category:
             return jsonify({'success': False, 'error': 'Category is required'}), 400
 
-        logger.info(f"[BLACKLIST] Adding category to blacklist: {category}")
+        logger.debug("[BLACKLIST] Adding category to blacklist: %s", category)
 
         # Load current blacklist (use config_ prefix like other endpoints)
-        current_blacklist_str = db.load_config('config_category_blacklist')
-        logger.info(f"[BLACKLIST] Loaded from DB (config_category_blacklist): {current_blacklist_str}")
-        logger.info(f"[BLACKLIST] Type: {type(current_blacklist_str)}, Is list?: {isinstance(current_blacklist_str, list)}")
-        current_blacklist = []
-
-        # Check if load_config already parsed it as a list
-        if isinstance(current_blacklist_str, list):
-            current_blacklist = current_blacklist_str
-            logger.info(f"[BLACKLIST] Already a list with {len(current_blacklist)} items")
-        elif current_blacklist_str:
-            try:
-                current_blacklist = json.loads(current_blacklist_str)
-                if not isinstance(current_blacklist, list):
-                    current_blacklist = []
-                logger.info(f"[BLACKLIST] Parsed as list: {len(current_blacklist)} categories")
-            except Exception as e:
-                logger.error(f"[BLACKLIST] Failed to parse JSON: {e}")
-                current_blacklist = []
+        current_blacklist, current_set = load_category_blacklist()
+        logger.debug("[BLACKLIST] Loaded from DB (config_category_blacklist): %s categories", len(current_blacklist))
 
         # Check if already exists
-        if category in current_blacklist:
-            logger.info(f"[BLACKLIST] Category already in blacklist: {category}")
+        if category in current_set:
+            logger.debug("[BLACKLIST] Category already in blacklist: %s", category)
             return jsonify({
                 'success': True,
                 'message': 'Category already in blacklist',
@@ -1237,17 +1486,18 @@ def api_add_category_to_blacklist():
 
         # Add new category
         current_blacklist.append(category)
-        logger.info(f"[BLACKLIST] New list has {len(current_blacklist)} categories")
+        logger.debug("[BLACKLIST] New list has %s categories", len(current_blacklist))
 
         # Save back to database (use config_ prefix like other endpoints)
-        new_value_json = json.dumps(current_blacklist)
-        logger.info(f"[BLACKLIST] Saving to DB (config_category_blacklist): {new_value_json[:200]}...")
+        new_value_json = orjson.dumps(current_blacklist).decode()
         save_result = db.save_config('config_category_blacklist', new_value_json)
-        logger.info(f"[BLACKLIST] save_config returned: {save_result}")
+        logger.debug("[BLACKLIST] save_config returned: %s", save_result)
 
         if save_result:
-            logger.info(f"[BLACKLIST] ✅ Category added: {category}")
-            logger.info(f"[BLACKLIST] Total categories in blacklist: {len(current_blacklist)}")
+            logger.info("[BLACKLIST] ✅ Category added: %s", category)
+            invalidate_config_cache()
+            forget_category_blacklist()
+            logger.debug("[BLACKLIST] Total categories in blacklist: %s", len(current_blacklist))
 
             # Trigger config reload in main app
             if 'app' in globals() and hasattr(globals()['app'], 'notification_app'):
@@ -1269,7 +1519,6 @@ def api_add_category_to_blacklist():
 
     except Exception as e:
         logger.error(f"[BLACKLIST] ❌ Error adding category: {e}")
-        import traceback
         logger.error(traceback.format_exc())
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -1278,33 +1527,19 @@ def api_add_category_to_blacklist():
 def api_railway_status():
     """Get Railway auto-redeploy status"""
     try:
-        # Get error statistics from database
-        recent_errors = db.get_recent_errors(limit=50)
-        
-        # Count errors by type
-        error_counts = {'403': 0, '401': 0, '429': 0, 'other': 0}
-        total_errors = 0
-        first_error = 'None'
-        last_error = 'None'
-        
-        for error in recent_errors:
-            total_errors += 1
-            error_msg = error.get('error_message', '')
-            
-            # Categorize errors
-            if '403' in error_msg:
-                error_counts['403'] += 1
-            elif '401' in error_msg:
-                error_counts['401'] += 1
-            elif '429' in error_msg:
-                error_counts['429'] += 1
-            else:
-                error_counts['other'] += 1
-            
-            # Track first and last error times
-            if first_error == 'None':
-                first_error = str(error.get('occurred_at', 'Unknown'))
-            last_error = str(error.get('occurred_at', 'Unknown'))
+        # Error statistics aggregated in SQL (counts by type + time range)
+        summary = db.get_error_summary(limit=50)
+        total_errors = summary.get('total_errors') or 0
+        error_counts = {
+            '403': summary.get('errors_403') or 0,
+            '401': summary.get('errors_401') or 0,
+            '429': summary.get('errors_429') or 0,
+            'other': summary.get('errors_other') or 0
+        }
+
+        # first_error = most recent, last_error = oldest of the window (as listed newest-first)
+        first_error = str(summary['newest_error']) if total_errors else 'None'
+        last_error = str(summary['oldest_error']) if total_errors else 'None'
         
         # Get last redeploy info from config
         last_redeploy = db.load_config('last_railway_redeploy', 'Never')
@@ -1334,25 +1569,34 @@ def api_railway_status():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/api/railway/redeploy', methods=['POST'])
-def api_railway_redeploy():
-    """Trigger Railway redeploy"""
+RAILWAY_REDEPLOY_TIMEOUT = 15  # seconds (Railway API request timeout is 10s)
+RAILWAY_REDEPLOY_COOLDOWN = 30  # seconds - repeat requests get the last successful result
+
+# Last successful redeploy: {'at': monotonic time, 'payload': response payload}
+_last_redeploy = {'at': None, 'payload': None}
+_last_redeploy_lock = threading.Lock()
+
+
+def recent_redeploy_payload():
+    """Payload of a redeploy that succeeded within RAILWAY_REDEPLOY_COOLDOWN, or None"""
+    with _last_redeploy_lock:
+        at = _last_redeploy['at']
+        if at is not None and time.monotonic() - at < RAILWAY_REDEPLOY_COOLDOWN:
+            return _last_redeploy['payload']
+    return None
+
+
+def trigger_railway_redeploy():
+    """
+    Call Railway GraphQL API to redeploy the service (runs as a background job)
+
+    Returns:
+        (response_payload, http_status)
+    """
     try:
-        import requests
-        from datetime import datetime
-        
         railway_token = config.RAILWAY_TOKEN
-        railway_project_id = config.RAILWAY_PROJECT_ID
         railway_service_id = config.RAILWAY_SERVICE_ID
-        
-        if not railway_token:
-            logger.error("❌ RAILWAY_TOKEN not configured")
-            return jsonify({'success': False, 'error': 'Railway token not configured'}), 400
-        
-        if not railway_project_id or not railway_service_id:
-            logger.error("❌ Railway project/service IDs not configured")
-            return jsonify({'success': False, 'error': 'Railway project/service IDs not configured'}), 400
-        
+
         logger.info("🔄 Triggering Railway redeploy...")
         
         # Railway GraphQL API endpoint
@@ -1377,7 +1621,7 @@ def api_railway_redeploy():
             }
         }
         
-        response = requests.post(url, json=payload, headers=headers, timeout=10)
+        response = railway_session.post(url, json=payload, headers=headers, timeout=10)
         
         if response.status_code == 200:
             result = response.json()
@@ -1386,7 +1630,7 @@ def api_railway_redeploy():
             if 'errors' in result:
                 error_msg = result['errors'][0].get('message', 'Unknown error')
                 logger.error(f"❌ Railway API error: {error_msg}")
-                return jsonify({'success': False, 'error': f'Railway API error: {error_msg}'}), 500
+                return {'success': False, 'error': f'Railway API error: {error_msg}'}, 500
             
             # Save redeploy timestamp
             db.save_config('last_railway_redeploy', datetime.now().isoformat())
@@ -1394,36 +1638,136 @@ def api_railway_redeploy():
             logger.info("✅ Railway redeploy triggered successfully")
             db.add_log_entry('INFO', 'Railway redeploy triggered from web UI', 'railway')
             
-            return jsonify({
+            return {
                 'success': True,
                 'message': 'Railway redeploy triggered successfully',
                 'timestamp': datetime.now().isoformat()
-            })
+            }, 200
         else:
             logger.error(f"❌ Railway API returned status {response.status_code}: {response.text}")
-            return jsonify({
+            return {
                 'success': False,
                 'error': f'Railway API error: HTTP {response.status_code}'
-            }), 500
+            }, 500
             
     except requests.exceptions.Timeout:
         logger.error("❌ Railway API request timed out")
-        return jsonify({'success': False, 'error': 'Request timed out'}), 500
+        return {'success': False, 'error': 'Request timed out'}, 500
+    except Exception as e:
+        logger.error(f"❌ Error triggering redeploy: {e}")
+        logger.error(traceback.format_exc())
+        return {'success': False, 'error': str(e)}, 500
+
+
+@app.route('/api/railway/redeploy', methods=['POST'])
+def api_railway_redeploy():
+    """Trigger Railway redeploy"""
+    try:
+        if not config.RAILWAY_TOKEN:
+            logger.error("❌ RAILWAY_TOKEN not configured")
+            return jsonify({'success': False, 'error': 'Railway token not configured'}), 400
+        
+        if not config.RAILWAY_PROJECT_ID or not config.RAILWAY_SERVICE_ID:
+            logger.error("❌ Railway project/service IDs not configured")
+            return jsonify({'success': False, 'error': 'Railway project/service IDs not configured'}), 400
+        
+        # A redeploy that just went through is not sent to Railway again
+        recent = recent_redeploy_payload()
+        if recent is not None:
+            return jsonify({**recent, 'coalesced': True}), 200
+
+        # Concurrent clicks join the in-flight redeploy instead of firing another one
+        job_id, _ = submit_job('railway_redeploy', trigger_railway_redeploy)
+        try:
+            payload, status_code = _jobs[job_id]['future'].result(timeout=RAILWAY_REDEPLOY_TIMEOUT)
+        except FutureTimeoutError:
+            return jsonify({'success': False, 'job_id': job_id, 'error': 'Redeploy request still running'}), 504
+
+        if status_code == 200:
+            with _last_redeploy_lock:
+                _last_redeploy.update(at=time.monotonic(), payload=payload)
+
+        return jsonify(payload), status_code
     except Exception as e:
         logger.error(f"❌ Error triggering redeploy: {e}")
-        import traceback
         logger.error(traceback.format_exc())
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+PROXY_TEST_URL = "https://jp.mercari.com"  # Fast endpoint for proxy checks
+PROXY_TEST_TIMEOUT = 5  # seconds
+PROXY_TEST_CONCURRENCY = 32  # Max simultaneous proxy connections per test run
+PROXY_TEST_DEADLINE = 30  # seconds - overall cap for one test run
+
+# One proxy test at a time per process - repeated admin clicks don't multiply the fan-out
+_proxy_test_lock = threading.Lock()
+
+
+async def probe_proxy(session, proxy, semaphore):
+    """Test a single proxy (the semaphore slot is taken before the request's timeout starts)"""
+    result = {
+        'proxy': proxy,
+        'working': False,
+        'response_time': None,
+        'error': None
+    }
+
+    loop = asyncio.get_running_loop()
+    async with semaphore:
+        try:
+            start_time = loop.time()
+            async with session.get(PROXY_TEST_URL, proxy=proxy) as response:
+                end_time = loop.time()
+
+                if response.status == 200:
+                    result['working'] = True
+                    result['response_time'] = round((end_time - start_time) * 1000, 2)  # ms
+                else:
+                    result['error'] = f"HTTP {response.status}"
+
+        except asyncio.TimeoutError:
+            result['error'] = "Timeout"
+        except (aiohttp.ClientProxyConnectionError, aiohttp.ClientHttpProxyError):
+            result['error'] = "Proxy connection failed"
+        except aiohttp.ClientConnectionError:
+            result['error'] = "Connection error"
+        except Exception as e:
+            result['error'] = str(e)
+
+    return result
+
+
+async def probe_proxies(proxy_list):
+    """
+    Test all proxies concurrently on one event loop, PROXY_TEST_CONCURRENCY at a time
+
+    Probes still queued or running after PROXY_TEST_DEADLINE are cancelled and
+    reported as timeouts, so a long proxy list can't hang the API.
+    """
+    # Concurrency is bounded by the semaphore, not the connector: aiohttp's total timeout
+    # starts before a request waits for a connector slot, so queued probes would time out
+    timeout = aiohttp.ClientTimeout(total=PROXY_TEST_TIMEOUT)
+    connector = aiohttp.TCPConnector(limit=0)
+    semaphore = asyncio.Semaphore(PROXY_TEST_CONCURRENCY)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        tasks = [asyncio.ensure_future(probe_proxy(session, proxy, semaphore)) for proxy in proxy_list]
+        _, pending = await asyncio.wait(tasks, timeout=PROXY_TEST_DEADLINE)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        return [
+            task.result() if task not in pending else
+            {'proxy': proxy, 'working': False, 'response_time': None, 'error': "Timeout"}
+            for proxy, task in zip(proxy_list, tasks)
+        ]
+
+
 @app.route('/api/proxy/test', methods=['POST'])
 def api_test_proxies():
     """Test proxy connections"""
     try:
-        import requests
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-        import time
-        
         logger.info("🔍 Testing proxy connections...")
         
         # Get proxy list from config
@@ -1446,66 +1790,23 @@ def api_test_proxies():
                 'message': 'No proxies configured'
             })
         
-        # Test URL (fast endpoint)
-        test_url = "https://jp.mercari.com"
-        timeout = 5
-        
-        def test_proxy(proxy):
-            """Test a single proxy"""
-            result = {
-                'proxy': proxy,
-                'working': False,
-                'response_time': None,
-                'error': None
-            }
-            
-            try:
-                start_time = time.time()
-                proxies = {
-                    'http': proxy,
-                    'https': proxy
-                }
-                
-                response = requests.get(test_url, proxies=proxies, timeout=timeout)
-                end_time = time.time()
-                
-                if response.status_code == 200:
-                    result['working'] = True
-                    result['response_time'] = round((end_time - start_time) * 1000, 2)  # ms
-                else:
-                    result['error'] = f"HTTP {response.status_code}"
-                    
-            except requests.exceptions.Timeout:
-                result['error'] = "Timeout"
-            except requests.exceptions.ProxyError:
-                result['error'] = "Proxy connection failed"
-            except requests.exceptions.ConnectionError:
-                result['error'] = "Connection error"
-            except Exception as e:
-                result['error'] = str(e)
-            
-            return result
-        
+        if not _proxy_test_lock.acquire(blocking=False):
+            return jsonify({'success': False, 'error': 'Proxy test already running'}), 409
+
         # Test proxies in parallel
-        results = []
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            futures = {executor.submit(test_proxy, proxy): proxy for proxy in proxy_list}
-            
-            for future in as_completed(futures):
-                try:
-                    result = future.result()
-                    results.append(result)
-                    
-                    if result['working']:
-                        logger.info(f"✅ Proxy OK: {result['proxy']} ({result['response_time']}ms)")
-                    else:
-                        logger.warning(f"❌ Proxy FAILED: {result['proxy']} - {result['error']}")
-                        
-                except Exception as e:
-                    logger.error(f"Error testing proxy: {e}")
-        
-        # Calculate statistics
-        working_count = sum(1 for r in results if r['working'])
+        try:
+            results = asyncio.run(probe_proxies(proxy_list))
+        finally:
+            _proxy_test_lock.release()
+
+        # Log each result and count working proxies in the same pass
+        working_count = 0
+        for result in results:
+            if result['working']:
+                working_count += 1
+                logger.info(f"✅ Proxy OK: {result['proxy']} ({result['response_time']}ms)")
+            else:
+                logger.warning(f"❌ Proxy FAILED: {result['proxy']} - {result['error']}")
         total_count = len(results)
         
         logger.info(f"📊 Proxy test completed: {working_count}/{total_count} working")
@@ -1521,11 +1822,29 @@ def api_test_proxies():
         
     except Exception as e:
         logger.error(f"❌ Error testing proxies: {e}")
-        import traceback
         logger.error(traceback.format_exc())
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def run_scan_after_clear():
+    """Rescan all queries after the items table was cleared (background job)"""
+    try:
+        from core import MercariSearcher
+        searcher = MercariSearcher()
+        results = searcher.search_all_queries()
+
+        logger.info(f"✅ Scan after clear completed: {results}")
+        db.add_log_entry('INFO',
+            f"Scan after clear completed: {results.get('new_items', 0)} items found",
+            'api',
+            f"Total: {results.get('total_items_found', 0)}")
+        return results
+    except Exception as e:
+        logger.error(f"❌ Error in scan after clear: {e}")
+        db.add_log_entry('ERROR', f'Scan after clear failed: {str(e)}', 'api')
+        raise
+
+
 @app.route('/api/clear-all-items', methods=['POST'])
 def api_clear_all_items():
     """Clear all items from database and trigger new scan"""
@@ -1533,44 +1852,25 @@ def api_clear_all_items():
         logger.info("🗑️  Clear all items triggered via API")
         db.add_log_entry('WARNING', 'Clear all items triggered from web UI', 'api')
         
-        # Get count before deletion
-        stats = db.get_statistics()
-        items_count = stats.get('total_items', 0)
-        
-        # Delete all items
-        if db.db_type == 'postgresql':
-            db.execute_query("DELETE FROM items")
-        else:
-            db.execute_query("DELETE FROM items")
-        
+        # Delete all items (TRUNCATE on PostgreSQL)
+        items_count = db.clear_all_items()
+        invalidate_dashboard_cache()
+        image_cache_clear()
+        submit_job('image_file_clear', clear_item_image_files)
+
         logger.info(f"✅ Deleted {items_count} items from database")
         db.add_log_entry('INFO', f'Deleted {items_count} items from database', 'api')
         
-        # Trigger new scan in background
-        import threading
-        
-        def run_scan():
-            try:
-                from core import MercariSearcher
-                searcher = MercariSearcher()
-                results = searcher.search_all_queries()
-                
-                logger.info(f"✅ Scan after clear completed: {results}")
-                db.add_log_entry('INFO',
-                    f"Scan after clear completed: {results.get('new_items', 0)} items found",
-                    'api',
-                    f"Total: {results.get('total_items_found', 0)}")
-            except Exception as e:
-                logger.error(f"❌ Error in scan after clear: {e}")
-                db.add_log_entry('ERROR', f'Scan after clear failed: {str(e)}', 'api')
-        
-        scan_thread = threading.Thread(target=run_scan, daemon=True)
-        scan_thread.start()
-        
+        # Trigger new scan in background - shares the scan slot, so repeated clicks
+        # (or a manual scan already in flight) never start overlapping full scans
+        job_id, created = submit_job(SCAN_JOB_KIND, run_scan_after_clear)
+        scan_message = 'New scan started in background!' if created else 'A scan is already running.'
+
         return jsonify({
             'success': True,
-            'message': f'Deleted {items_count} items. New scan started in background!',
-            'deleted_count': items_count
+            'message': f'Deleted {items_count} items. {scan_message}',
+            'deleted_count': items_count,
+            'job_id': job_id
         })
     except Exception as e:
         logger.error(f"❌ Error clearing items: {e}")
@@ -1578,6 +1878,330 @@ def api_clear_all_items():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+IMAGE_STREAM_CHUNK = 64 * 1024  # Bytes per chunk when relaying upstream images
+# (connect, read) seconds - an unreachable CDN edge frees the request thread after 3s
+# instead of holding one of the gthread worker's threads for the full 10s
+IMAGE_FETCH_TIMEOUT = (3, 10)
+
+# Shared HTTP session for image proxies - keep-alive connections to Mercari's CDN skip a TLS
+# handshake per image. Retries cover idempotent GETs on connection errors, 429 and 5xx only
+image_session = requests.Session()
+_image_adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=128,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.2,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({'GET'}),
+        raise_on_status=False
+    )
+)
+image_session.mount('https://', _image_adapter)
+image_session.mount('http://', _image_adapter)
+
+# Browser-like headers for /proxy-image (Chrome on Mac headers to appear more legitimate)
+# Read-only module constants: built once, shared by every request
+PROXY_IMAGE_HEADERS = MappingProxyType({
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Referer': 'https://jp.mercari.com/',
+    'Origin': 'https://jp.mercari.com',
+    'Accept': 'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8',
+    'Accept-Language': 'ja-JP,ja;q=0.9,en-US;q=0.8,en;q=0.7',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Sec-Ch-Ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
+    'Sec-Ch-Ua-Mobile': '?0',
+    'Sec-Ch-Ua-Platform': '"macOS"',
+    'Sec-Fetch-Dest': 'image',
+    'Sec-Fetch-Mode': 'no-cors',
+    'Sec-Fetch-Site': 'cross-site',
+    'Pragma': 'no-cache',
+    'Cache-Control': 'no-cache'
+})
+
+# Headers for /api/image-proxy
+IMAGE_PROXY_HEADERS = MappingProxyType({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Referer': 'https://jp.mercari.com/',
+    'Accept': 'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8',
+})
+
+
+# In-process LRU of proxied image bytes: url -> (bytes, content_type, validators). Images are immutable,
+# so repeat dashboard hits never go back to Mercari's CDN
+IMAGE_CACHE_MAX_BYTES = config.IMAGE_CACHE_MB * 1024 * 1024
+IMAGE_CACHE_ITEM_MAX_BYTES = 4 * 1024 * 1024  # One huge file must not flush the whole cache
+IMAGE_CACHE_CONTROL = 'public, max-age=2592000, immutable'  # 30 days
+CONDITIONAL_REQUEST_HEADERS = ('If-None-Match', 'If-Modified-Since')
+VALIDATOR_HEADERS = ('ETag', 'Last-Modified')
+
+_image_cache = OrderedDict()
+_image_cache_bytes = 0
+_image_cache_lock = threading.Lock()
+
+
+def image_cache_get(url):
+    """Return cached (bytes, content_type, validators) for url, or None"""
+    with _image_cache_lock:
+        entry = _image_cache.get(url)
+        if entry is not None:
+            _image_cache.move_to_end(url)
+        return entry
+
+
+def image_cache_put(url, data, content_type, validators):
+    """Store image bytes, evicting least recently used entries over the byte budget"""
+    global _image_cache_bytes
+    if len(data) > IMAGE_CACHE_ITEM_MAX_BYTES:
+        return
+    with _image_cache_lock:
+        previous = _image_cache.pop(url, None)
+        if previous is not None:
+            _image_cache_bytes -= len(previous[0])
+        _image_cache[url] = (data, content_type, validators)
+        _image_cache_bytes += len(data)
+        while _image_cache_bytes > IMAGE_CACHE_MAX_BYTES and _image_cache:
+            _, (evicted, *_) = _image_cache.popitem(last=False)
+            _image_cache_bytes -= len(evicted)
+
+
+def image_cache_clear():
+    """Drop every cached image (item ids can be reused once items are deleted on SQLite)"""
+    global _image_cache_bytes
+    with _image_cache_lock:
+        _image_cache.clear()
+        _image_cache_bytes = 0
+
+
+# Optional disk tier (IMAGE_DISK_CACHE_DIR): proxied images under proxy/ and stored item images
+# under items/, both served with send_file and surviving restarts. Proxied files older than the
+# TTL are refetched; item files are touched on use. A background sweep deletes expired files and
+# evicts oldest-first once the directory outgrows IMAGE_DISK_CACHE_MB
+IMAGE_DISK_CACHE_TTL = 24 * 3600  # seconds
+IMAGE_DISK_SWEEP_EVERY = 500  # disk writes between expiry sweeps
+IMAGE_DISK_SWEEP_TARGET = 0.9  # evict down to this fraction of the budget
+IMAGE_DISK_TMP_MAX_AGE = 3600  # seconds - unmatched .tmp/.mime files older than this are abandoned writes
+IMAGE_DISK_TOUCH_AFTER = 3600  # seconds - refresh an item file's mtime on use at most this often
+ITEM_IMAGE_FILE_RE = re.compile(r'^\d+-[0-9a-f]{16}$')  # write_image_file() names
+
+_image_disk_lock = threading.Lock()
+_image_disk_writes = {}  # cache directory -> writes since boot
+_image_disk_bytes = {}  # cache directory -> bytes on disk; missing until a sweep measures it
+
+
+def image_disk_budget(directory):
+    """Size budget in bytes for a swept image directory"""
+    if directory == config.X_ACCEL_IMAGE_DIR:
+        return config.X_ACCEL_IMAGE_MB * 1024 * 1024
+    return config.IMAGE_DISK_CACHE_MB * 1024 * 1024
+
+
+def note_image_disk_write(directory, size):
+    """Account a new file in directory and schedule a sweep when it is due"""
+    with _image_disk_lock:
+        writes = _image_disk_writes.get(directory, 0) + 1
+        _image_disk_writes[directory] = writes
+        total = _image_disk_bytes.get(directory)
+        if total is not None:
+            total += size
+            _image_disk_bytes[directory] = total
+        sweep = (total is None
+                 or total > image_disk_budget(directory)
+                 or writes % IMAGE_DISK_SWEEP_EVERY == 0)
+    if sweep:
+        submit_job(f'image_disk_sweep:{directory}', sweep_image_disk_cache, directory)
+
+
+def proxy_disk_path(url):
+    """Content-addressed file path for a proxied image URL"""
+    key = hashlib.sha256(url.encode()).hexdigest()
+    return os.path.join(config.IMAGE_DISK_CACHE_DIR, 'proxy', key[:2], key)
+
+
+def proxy_disk_get(url):
+    """Return (path, content_type) of a fresh on-disk copy of url, or None"""
+    if not config.IMAGE_DISK_CACHE_DIR:
+        return None
+    path = proxy_disk_path(url)
+    try:
+        if time.time() - os.stat(path).st_mtime > IMAGE_DISK_CACHE_TTL:
+            return None
+        with open(f"{path}.mime") as f:
+            return path, f.read()
+    except OSError:
+        return None
+
+
+def proxy_disk_put(url, data, content_type):
+    """Write a proxied image to the disk tier (MIME sidecar first, then atomic rename)"""
+    path = proxy_disk_path(url)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.mime", 'w') as f:
+            f.write(content_type)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Failed to write image disk cache: {e}")
+        return
+
+    note_image_disk_write(config.IMAGE_DISK_CACHE_DIR, len(data))
+
+
+def remove_quietly(path):
+    """os.remove that ignores files already gone"""
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
+
+
+def sweep_image_disk_cache(directory):
+    """
+    Bound an image cache directory (recursively)
+
+    Deletes expired images, orphaned .mime sidecars and abandoned .tmp writes, then evicts the
+    oldest images until the directory fits IMAGE_DISK_SWEEP_TARGET of its budget.
+    """
+    now = time.time()
+    cutoff = now - IMAGE_DISK_CACHE_TTL
+    images = []  # (mtime, size, path)
+    sidecars = set()
+    removed = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if name.endswith('.mime'):
+                # Young sidecars may belong to a write still in progress
+                if stat.st_mtime < now - IMAGE_DISK_TMP_MAX_AGE:
+                    sidecars.add(path)
+            elif name.endswith('.tmp'):
+                if stat.st_mtime < now - IMAGE_DISK_TMP_MAX_AGE:
+                    removed += remove_quietly(path)
+            elif stat.st_mtime < cutoff:
+                removed += remove_quietly(path)
+                removed += remove_quietly(f"{path}.mime")
+                sidecars.discard(f"{path}.mime")
+            else:
+                images.append((stat.st_mtime, stat.st_size, path))
+
+    # Sidecars without an image: failed writes or images deleted elsewhere
+    live = {f"{path}.mime" for _, _, path in images}
+    for sidecar in sidecars - live:
+        removed += remove_quietly(sidecar)
+
+    total = sum(size for _, size, _ in images)
+    budget = image_disk_budget(directory)
+    if total > budget:
+        target = budget * IMAGE_DISK_SWEEP_TARGET
+        images.sort()
+        for _, size, path in images:
+            if total <= target:
+                break
+            if remove_quietly(path):
+                total -= size
+                removed += 1
+            removed += remove_quietly(f"{path}.mime")
+
+    with _image_disk_lock:
+        _image_disk_bytes[directory] = total
+    logger.info(f"Image disk cache sweep of {directory} removed {removed} files "
+                f"({total // (1024 * 1024)} MB kept)")
+    return removed
+
+
+def clear_item_image_files():
+    """Delete stored-item image files (after the items table is cleared)"""
+    if config.IMAGE_DISK_CACHE_DIR:
+        shutil.rmtree(os.path.join(config.IMAGE_DISK_CACHE_DIR, 'items'), ignore_errors=True)
+        with _image_disk_lock:
+            _image_disk_bytes.pop(config.IMAGE_DISK_CACHE_DIR, None)  # re-measured by the next sweep
+    if config.X_ACCEL_IMAGE_DIR:
+        # Only our {item_id}-{etag} files - the directory is shared with nginx's alias
+        try:
+            names = os.listdir(config.X_ACCEL_IMAGE_DIR)
+        except OSError:
+            names = []
+        for name in names:
+            if ITEM_IMAGE_FILE_RE.match(name):
+                remove_quietly(os.path.join(config.X_ACCEL_IMAGE_DIR, name))
+        with _image_disk_lock:
+            _image_disk_bytes.pop(config.X_ACCEL_IMAGE_DIR, None)
+
+
+def disk_image_response(path, content_type, headers):
+    """Serve a disk-cached image with send_file (sendfile(2), conditional 304)"""
+    response = send_file(os.path.abspath(path), mimetype=content_type, conditional=True)
+    response.headers.update(headers)
+    return response
+
+
+def stream_upstream(response, chunk_size=IMAGE_STREAM_CHUNK, cache_key=None):
+    """
+    Yield upstream body chunks, always releasing the connection when done
+
+    With cache_key, a fully received body (up to IMAGE_CACHE_ITEM_MAX_BYTES) is
+    stored in the image cache once the last chunk has been sent.
+    """
+    chunks = [] if cache_key else None
+    size = 0
+    complete = False
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if chunks is not None:
+                size += len(chunk)
+                if size > IMAGE_CACHE_ITEM_MAX_BYTES:
+                    chunks = None
+                else:
+                    chunks.append(chunk)
+            yield chunk
+        complete = True
+    finally:
+        response.close()
+        if complete and chunks is not None:
+            data = b''.join(chunks)
+            content_type = response.headers.get('Content-Type', 'image/jpeg')
+            image_cache_put(cache_key, data, content_type, upstream_validators(response.headers))
+            if config.IMAGE_DISK_CACHE_DIR:
+                proxy_disk_put(cache_key, data, content_type)
+
+
+def upstream_request_headers(base_headers):
+    """Outbound image headers plus the browser's conditional headers, so the CDN can answer 304"""
+    conditional = {name: request.headers[name] for name in CONDITIONAL_REQUEST_HEADERS if name in request.headers}
+    return {**base_headers, **conditional} if conditional else base_headers
+
+
+def upstream_validators(headers):
+    """ETag / Last-Modified from an upstream response, relayed to the browser"""
+    return {name: headers[name] for name in VALIDATOR_HEADERS if name in headers}
+
+
+def client_has_image(validators):
+    """True when the browser's If-None-Match / If-Modified-Since matches the cached image"""
+    etag = validators.get('ETag')
+    if etag and 'If-None-Match' in request.headers:
+        return request.if_none_match.contains_weak(unquote_etag(etag)[0])
+    last_modified = validators.get('Last-Modified')
+    return bool(last_modified) and request.headers.get('If-Modified-Since') == last_modified
+
+
+def image_response(cached, headers):
+    """Serve a cached image - 304 without body when the browser already has it"""
+    data, content_type, validators = cached
+    if client_has_image(validators):
+        return Response(status=304, headers={**headers, **validators})
+    return Response(data, content_type=content_type, headers={**headers, **validators})
+
+
 @app.route('/proxy-image')
 def proxy_image():
     """
@@ -1585,48 +2209,46 @@ def proxy_image():
     Returns the image with proper headers so browser can display it
     """
     try:
-        import requests
-        from flask import Response
-
         # Get target image URL
         image_url = request.args.get('url')
         if not image_url:
             return "No URL provided", 400
 
-        # Fetch image with proper headers (pretend to be a browser from Mercari)
-        # Use Chrome on Mac headers to appear more legitimate
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Referer': 'https://jp.mercari.com/',
-            'Origin': 'https://jp.mercari.com',
-            'Accept': 'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8',
-            'Accept-Language': 'ja-JP,ja;q=0.9,en-US;q=0.8,en;q=0.7',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Sec-Ch-Ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
-            'Sec-Ch-Ua-Mobile': '?0',
-            'Sec-Ch-Ua-Platform': '"macOS"',
-            'Sec-Fetch-Dest': 'image',
-            'Sec-Fetch-Mode': 'no-cors',
-            'Sec-Fetch-Site': 'cross-site',
-            'Pragma': 'no-cache',
-            'Cache-Control': 'no-cache'
+        response_headers = {
+            'Cache-Control': IMAGE_CACHE_CONTROL,
+            'Access-Control-Allow-Origin': '*'
         }
+        cached = image_cache_get(image_url)
+        if cached:
+            return image_response(cached, response_headers)
+        on_disk = proxy_disk_get(image_url)
+        if on_disk:
+            return disk_image_response(*on_disk, response_headers)
+
+        # Fetch image with proper headers (pretend to be a browser from Mercari)
+        response = image_session.get(image_url, headers=upstream_request_headers(PROXY_IMAGE_HEADERS),
+                                     timeout=IMAGE_FETCH_TIMEOUT, stream=True)
+        response_headers.update(upstream_validators(response.headers))
 
-        # Make request with timeout
-        response = requests.get(image_url, headers=headers, timeout=10, stream=True)
+        if response.status_code == 304:
+            # Browser's copy is still valid upstream - nothing to relay
+            response.close()
+            return Response(status=304, headers=response_headers)
 
         if response.status_code == 200:
-            # Return image with correct content type
+            # Length is only known up front when requests won't decompress the body
+            if 'Content-Length' in response.headers and 'Content-Encoding' not in response.headers:
+                response_headers['Content-Length'] = response.headers['Content-Length']
+
+            # Stream bytes to the client as they arrive instead of buffering the whole image
             return Response(
-                response.content,
+                stream_upstream(response, cache_key=image_url),
                 mimetype=response.headers.get('Content-Type', 'image/jpeg'),
-                headers={
-                    'Cache-Control': 'public, max-age=86400',  # Cache for 24h
-                    'Access-Control-Allow-Origin': '*'
-                }
+                headers=response_headers,
+                direct_passthrough=True
             )
         else:
+            response.close()
             logger.warning(f"Failed to fetch image: {response.status_code}")
             return f"Failed to fetch image: {response.status_code}", response.status_code
 
@@ -1635,54 +2257,113 @@ def proxy_image():
         return f"Error: {str(e)}", 500
 
 
-@app.route('/api/image/<int:item_id>')
-def get_item_image(item_id):
+def write_image_file(directory, item_id, image_bytes, etag, cache_root=None):
     """
-    Serve image from database (base64-encoded)
-    This endpoint returns images stored in the database to bypass Cloudflare
+    Write an item image into directory (once, atomically) and return its file name
+
+    With cache_root the file counts towards that swept directory's budget, and its mtime is
+    refreshed on use so the sweep's TTL and oldest-first eviction act as an LRU.
     """
+    # Content hash in the name: SQLite may reuse item ids after the items table is cleared
+    filename = f"{item_id}-{etag}"
+    path = os.path.join(directory, filename)
     try:
-        from flask import Response
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(image_bytes)
+        os.replace(tmp_path, path)
+        if cache_root:
+            note_image_disk_write(cache_root, len(image_bytes))
+        return filename
+
+    if cache_root and time.time() - mtime > IMAGE_DISK_TOUCH_AFTER:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+    return filename
 
-        # Query item from database
-        query = "SELECT image_data, image_url FROM items WHERE id = %s"
-        result = db.execute_query(query, (item_id,), fetch=True)
 
-        if not result or len(result) == 0:
-            logger.warning(f"Item {item_id} not found")
-            return "Item not found", 404
+def x_accel_image_response(item_id, image_bytes, content_type, etag):
+    """Write the image to the nginx-served directory (once) and let nginx send the bytes"""
+    # Swept like the disk cache (TTL + X_ACCEL_IMAGE_MB) - nginx only reads these files
+    filename = write_image_file(config.X_ACCEL_IMAGE_DIR, item_id, image_bytes, etag,
+                                cache_root=config.X_ACCEL_IMAGE_DIR)
+    return Response(headers={
+        'X-Accel-Redirect': config.X_ACCEL_IMAGE_LOCATION + filename,
+        'Content-Type': content_type,
+        'Cache-Control': 'public, max-age=2592000',
+        'Access-Control-Allow-Origin': '*',
+    })
 
-        item = result[0]
-        image_data = item.get('image_data')
-        image_url = item.get('image_url')
-
-        # If we have base64 image data, return it
-        if image_data:
-            # image_data is already a data URI: data:image/jpeg;base64,{data}
-            # Extract just the base64 part
-            if image_data.startswith('data:'):
-                # Parse data URI: data:image/jpeg;base64,{base64data}
-                parts = image_data.split(',', 1)
-                if len(parts) == 2:
-                    content_type = parts[0].split(';')[0].replace('data:', '')
-                    base64_data = parts[1]
-
-                    # Decode base64 to bytes
-                    import base64
-                    image_bytes = base64.b64decode(base64_data)
-
-                    return Response(
-                        image_bytes,
-                        mimetype=content_type,
-                        headers={
-                            'Cache-Control': 'public, max-age=2592000',  # Cache for 30 days
-                            'Access-Control-Allow-Origin': '*'
-                        }
-                    )
+
+@app.route('/api/image/<int:item_id>')
+def get_item_image(item_id):
+    """
+    Serve image from database (raw bytes; legacy base64 rows are converted on first serve)
+    This endpoint returns images stored in the database to bypass Cloudflare
+    """
+    try:
+        # Stored images never change for an item - serve repeat hits without touching the DB
+        cache_key = f'item:{item_id}'
+        cached = image_cache_get(cache_key)
+        image_url = None
+
+        if cached is None:
+            query = "SELECT image_bytes, image_mime, image_data, image_url FROM items WHERE id = %s"
+            row = db.execute_query_one(query, (item_id,))
+
+            if row is None:
+                logger.warning(f"Item {item_id} not found")
+                return "Item not found", 404
+
+            image_bytes, content_type, image_data, image_url = row
+            content_type = content_type or 'image/jpeg'
+
+            # Legacy row: decode the data URI once and keep raw bytes for next time
+            if image_bytes is None and image_data:
+                image_bytes, content_type = decode_data_uri(image_data)
+                if image_bytes:
+                    db.store_image_bytes(item_id, image_bytes, content_type)
+
+            if image_bytes:
+                image_bytes = bytes(image_bytes)  # psycopg2 returns BYTEA as memoryview
+                cached = (image_bytes, content_type,
+                          {'ETag': hashlib.sha1(image_bytes).hexdigest()[:16]})
+                image_cache_put(cache_key, *cached)
+
+        if cached is not None:
+            image_bytes, content_type, validators = cached
+            etag = validators['ETag']
+
+            if config.X_ACCEL_IMAGE_DIR:
+                return x_accel_image_response(item_id, image_bytes, content_type, etag)
+
+            # A real file lets Gunicorn's file wrapper use sendfile(2) instead of copying in Python
+            if config.IMAGE_DISK_CACHE_DIR:
+                items_dir = os.path.join(config.IMAGE_DISK_CACHE_DIR, 'items')
+                filename = write_image_file(items_dir, item_id, image_bytes, etag,
+                                            cache_root=config.IMAGE_DISK_CACHE_DIR)
+                image_source = os.path.abspath(os.path.join(items_dir, filename))
+            else:
+                image_source = io.BytesIO(image_bytes)
+
+            # send_file handles If-None-Match (304 with no body) and Range requests
+            response = send_file(
+                image_source,
+                mimetype=content_type,
+                etag=etag,
+                max_age=2592000,  # Cache for 30 days
+                conditional=True
+            )
+            response.headers['Access-Control-Allow-Origin'] = '*'
+            return response
 
         # Fallback: if no image_data, redirect to original URL
         if image_url:
-            from flask import redirect
             return redirect(image_url)
 
         # No image at all
@@ -1700,25 +2381,36 @@ def image_proxy():
         if not image_url:
             return "No URL provided", 400
         
+        response_headers = {'Cache-Control': IMAGE_CACHE_CONTROL}
+        cached = image_cache_get(image_url)
+        if cached:
+            return image_response(cached, response_headers)
+        on_disk = proxy_disk_get(image_url)
+        if on_disk:
+            return disk_image_response(*on_disk, response_headers)
+
         # Request image with proper headers to bypass Cloudflare
-        import requests
-        from flask import Response
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Referer': 'https://jp.mercari.com/',
-            'Accept': 'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8',
-        }
-        
-        response = requests.get(image_url, headers=headers, timeout=10, stream=True)
-        
+        response = image_session.get(image_url, headers=upstream_request_headers(IMAGE_PROXY_HEADERS),
+                                     timeout=IMAGE_FETCH_TIMEOUT, stream=True)
+        response_headers.update(upstream_validators(response.headers))
+
+        if response.status_code == 304:
+            response.close()
+            return Response(status=304, headers=response_headers)
+
         if response.status_code == 200:
+            if 'Content-Length' in response.headers and 'Content-Encoding' not in response.headers:
+                response_headers['Content-Length'] = response.headers['Content-Length']
+
+            # stream_upstream() closes the response so the pooled connection is reused
             return Response(
-                response.iter_content(chunk_size=8192),
+                stream_upstream(response, cache_key=image_url),
                 content_type=response.headers.get('Content-Type', 'image/jpeg'),
-                headers={'Cache-Control': 'public, max-age=86400'}
+                headers=response_headers,
+                direct_passthrough=True
             )
         else:
+            response.close()
             logger.error(f"Image proxy failed: {response.status_code} for {image_url}")
             return f"Failed: {response.status_code}", response.status_code
             
@@ -1731,7 +2423,8 @@ def image_proxy():
 def api_proxy_stats():
     """Get proxy system statistics and status"""
     try:
-        from proxies import proxy_manager, proxy_rotator
+        import proxies
+        proxy_manager, proxy_rotator = proxies.proxy_manager, proxies.proxy_rotator
         
         if not proxy_manager:
             return jsonify({
@@ -1776,8 +2469,6 @@ def api_proxy_stats():
 def api_check_blacklist_item(item_id):
     """Check if item exists and why it passed/failed blacklist"""
     try:
-        from configuration_values import config
-        
         # Force reload config
         config._last_reload_time = 0
         config.reload_if_needed()
@@ -1846,7 +2537,6 @@ def api_check_blacklist_item(item_id):
         
     except Exception as e:
         logger.error(f"Error checking item: {e}")
-        import traceback
         logger.error(traceback.format_exc())
         return jsonify({
             'success': False,
@@ -1865,9 +2555,6 @@ def debug_blacklist():
 def api_debug_blacklist():
     """Get detailed blacklist debug info"""
     try:
-        from configuration_values import config
-        import json
-        
         # Get from database directly
         all_config = db.get_all_config()
         
@@ -1898,7 +2585,6 @@ def api_debug_blacklist():
             'database_type': db.db_type
         })
     except Exception as e:
-        import traceback
         logger.error(traceback.format_exc())
         return jsonify({
             'success': False,
@@ -1911,8 +2597,6 @@ def api_debug_blacklist():
 def api_clean_blacklisted_items():
     """Delete all items with blacklisted categories"""
     try:
-        from configuration_values import config
-        
         # Reload blacklist
         config._last_reload_time = 0
         config.reload_if_needed()
@@ -1940,6 +2624,9 @@ def api_clean_blacklisted_items():
                 deleted_categories[category] = count
                 
                 logger.info(f"[CLEANUP] Deleted {count} items with category '{category}'")
+
+        if deleted_count:
+            image_cache_clear()
         
         return jsonify({
             'success': True,
@@ -1950,7 +2637,6 @@ def api_clean_blacklisted_items():
         
     except Exception as e:
         logger.error(f"Error cleaning blacklisted items: {e}")
-        import traceback
         logger.error(traceback.format_exc())
         return jsonify({
             'success': False,
@@ -1959,6 +2645,28 @@ def api_clean_blacklisted_items():
         }), 500
 
 
+def run_search_cycle():
+    """Run one search + Telegram cycle (background job for /api/trigger-search)"""
+    try:
+        from mercari_notifications import MercariNotificationApp
+
+        logger.info("[API] Creating MercariNotificationApp instance...")
+        app_instance = MercariNotificationApp()
+
+        logger.info("[API] Running search cycle...")
+        app_instance.search_cycle()
+
+        logger.info("[API] Running Telegram notification cycle...")
+        app_instance.telegram_cycle()
+
+        logger.info("[API] ✅ Search cycle completed successfully")
+        logger.info("=" * 60)
+
+    except Exception as e:
+        logger.error(f"[API] ❌ Error during search cycle: {e}")
+        logger.error(f"[API] Traceback:\n{traceback.format_exc()}")
+
+
 @app.route('/api/trigger-search', methods=['POST', 'GET'])
 def api_trigger_search():
     """
@@ -1967,9 +2675,6 @@ def api_trigger_search():
 
     Security: Add a secret token in request header or query parameter
     """
-    import threading
-    from datetime import datetime
-
     try:
         # Optional: Validate secret token (if configured)
         secret_token = os.getenv('CRON_SECRET_TOKEN')
@@ -1984,38 +2689,43 @@ def api_trigger_search():
         logger.info(f"[API] Search cycle triggered via API at {datetime.now()}")
         logger.info("=" * 60)
 
-        # Run search cycle in background thread to avoid blocking the request
-        def run_cycle():
-            try:
-                from mercari_notifications import MercariNotificationApp
-
-                logger.info("[API] Creating MercariNotificationApp instance...")
-                app_instance = MercariNotificationApp()
-
-                logger.info("[API] Running search cycle...")
-                app_instance.search_cycle()
-
-                logger.info("[API] Running Telegram notification cycle...")
-                app_instance.telegram_cycle()
-
-                logger.info("[API] ✅ Search cycle completed successfully")
-                logger.info("=" * 60)
-
-            except Exception as e:
-                logger.error(f"[API] ❌ Error during search cycle: {e}")
-                import traceback
-                logger.error(f"[API] Traceback:\n{traceback.format_exc()}")
-
-        # Start thread
-        thread = threading.Thread(target=run_cycle, daemon=True, name="API-TriggeredSearchCycle")
-        thread.start()
+        # Run search cycle as a background job; a scan already running (cron, Scan now or
+        # rescan after clear) is reused instead of starting a second one
+        job_id, created = submit_job(SCAN_JOB_KIND, run_search_cycle)
 
         return jsonify({
             'success': True,
-            'message': 'Search cycle started',
+            'message': 'Search cycle started' if created else 'A scan is already running',
+            'job_id': job_id,
             'triggered_at': datetime.now().isoformat()
         })
 
     except Exception as e:
         logger.error(f"[API] Error triggering search: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
+
+
+PAGE_TEMPLATES = ('dashboard.html', 'queries.html', 'items.html', 'logs.html', 'config.html')
+
+
+def warm_templates():
+    """Compile page templates into the Jinja cache so the first page views don't pay for it"""
+    for name in PAGE_TEMPLATES:
+        try:
+            app.jinja_env.get_template(name)
+        except Exception as e:
+            logger.warning(f"Template warm-up failed for {name}: {e}")
+
+
+warm_templates()
+
+
+@app.before_request
+def ensure_config_refresher():
+    """Hot reload config off the request path - started in the serving process, after any fork"""
+    start_config_refresher()
+
+
+if __name__ == '__main__':
+    # Local development only - production runs under Gunicorn (gthread), see gunicorn_config.py
+    app.run(host=config.WEB_UI_HOST, port=config.PORT, debug=config.WEB_UI_DEBUG, threaded=True)
@@ -7,18 +7,46 @@ This module loads Flask web application and starts automatic search scheduler.
 
 import os
 import sys
+import atexit
+import queue
 import logging
-import threading
+from logging.handlers import QueueHandler, QueueListener
 
-# Add current directory to Python path
-sys.path.insert(0, os.path.dirname(__file__))
+# Line-buffered stdout/stderr: each log line reaches Railway promptly without the
+# per-write flush of PYTHONUNBUFFERED=1
+sys.stdout.reconfigure(line_buffering=True, write_through=False)
+sys.stderr.reconfigure(line_buffering=True)
 
 # Setup logging for Railway
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    stream=sys.stdout
-)
+# Request threads only enqueue records (QueueHandler); one listener thread formats and writes
+# them to stdout, so gthread request threads don't serialize on the stream handler's lock
+stdout_handler = logging.StreamHandler(sys.stdout)
+stdout_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+queue_handler = QueueHandler(queue.SimpleQueue())
+# The queue side only merges args/traceback into the message; stdout_handler adds the prefix
+logging.basicConfig(level=logging.INFO, format='%(message)s', handlers=[queue_handler])
+
+_log_listener = None
+_log_listener_pid = None
+
+
+def start_log_listener():
+    """Start the stdout listener for this process (again after a fork - threads don't survive it)"""
+    global _log_listener, _log_listener_pid
+    if _log_listener_pid == os.getpid():
+        return
+    # Fresh queue per process: the parent's may have been mid-get() when it forked
+    queue_handler.queue = queue.SimpleQueue()
+    _log_listener = QueueListener(queue_handler.queue, stdout_handler)
+    _log_listener.start()
+    _log_listener_pid = os.getpid()
+    # stop() drains whatever is still queued at exit
+    atexit.register(_log_listener.stop)
+
+
+start_log_listener()
+# Any fork (Gunicorn preload, or anything else) restarts the listener in the child
+os.register_at_fork(after_in_child=start_log_listener)
 
 logger = logging.getLogger(__name__)
 
@@ -33,36 +61,8 @@ try:
     logger.info("[WSGI] ✅ Web UI is running")
     logger.info("=" * 60)
 
-    # Auto-create performance indexes on Railway (runs once on startup)
-    if os.getenv('RAILWAY_ENVIRONMENT'):
-        logger.info("[WSGI] Railway environment detected - creating performance indexes...")
-        try:
-            from db import get_db
-            db = get_db()
-
-            # Only run on PostgreSQL (Railway)
-            if db.db_type == 'postgresql':
-                logger.info("[INDEXES] Creating performance indexes for items table...")
-
-                indexes = [
-                    ("idx_items_found_at", "CREATE INDEX IF NOT EXISTS idx_items_found_at ON items (found_at DESC)"),
-                    ("idx_items_mercari_id_pattern", "CREATE INDEX IF NOT EXISTS idx_items_mercari_id_pattern ON items (mercari_id text_pattern_ops)"),
-                    ("idx_items_category_id", "CREATE INDEX IF NOT EXISTS idx_items_category_id ON items (category_id) WHERE category_id IS NOT NULL"),
-                ]
-
-                for idx_name, sql in indexes:
-                    try:
-                        db.execute_query(sql)
-                        logger.info(f"[INDEXES] ✅ Index created/verified: {idx_name}")
-                    except Exception as e:
-                        logger.error(f"[INDEXES] ❌ Failed to create {idx_name}: {e}")
-
-                logger.info("[INDEXES] ✅ Performance indexes ready")
-            else:
-                logger.info("[INDEXES] Skipped - only needed on PostgreSQL")
-        except Exception as e:
-            logger.error(f"[INDEXES] ❌ Index creation failed: {e}")
-            # Don't block startup if index creation fails
+    # Performance indexes are built by the Railway pre-deploy command (add_performance_indexes.py),
+    # so Gunicorn binds $PORT without waiting on index DDL
 
     # Scheduler runs in separate Railway worker service (like KS1)
     # Configured in Railway Dashboard with Start Command: python mercari_notifications.py
@@ -74,6 +74,6 @@ except Exception as e:
 
 
 if __name__ == "__main__":
-    # For local testing
-    port = int(os.getenv('PORT', 5000))
-    application.run(host='0.0.0.0', port=port, debug=True)
+    # For local testing - production runs under Gunicorn (gthread), see gunicorn_config.py
+    from configuration_values import config
+    application.run(host=config.WEB_UI_HOST, port=config.PORT, debug=config.WEB_UI_DEBUG, threaded=True)